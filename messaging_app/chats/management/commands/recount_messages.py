@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from chats.models import Conversation
+from chats.signals import recount_message_totals
+
+class Command(BaseCommand):
+    help = "Recompute Conversation.message_total from the messages table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('conversation_ids', nargs='*', help="Only recount these conversations.")
+
+    def handle(self, *args, **options):
+        conversations = Conversation.objects.all()
+        if options['conversation_ids']:
+            conversations = conversations.filter(pk__in=options['conversation_ids'])
+        updated = recount_message_totals(conversations)
+        self.stdout.write(f"Recounted {updated} conversation(s).")
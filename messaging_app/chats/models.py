@@ -24,6 +24,9 @@ class Conversation(models.Model):
         related_name='conversations'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Running message count kept up to date by chats.signals; lets
+    # MessagePagination report a total without COUNT(*)
+    message_total = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"Conversation ID: {self.conversation_id}"
@@ -52,4 +55,8 @@ class Message(models.Model):
 
     class Meta:
         # Order messages by the 'sent_at' field
-        ordering = ['sent_at']
\ No newline at end of file
+        ordering = ['sent_at']
+        # Backs the (sent_at, message_id) seek in MessageCursorPagination
+        indexes = [
+            models.Index(fields=['conversation', 'sent_at', 'message_id'], name='message_conversation_seek'),
+        ]
\ No newline at end of file
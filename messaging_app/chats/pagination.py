@@ -1,21 +1,269 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+import hashlib
+import uuid
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .models import Conversation
+
+class KnownCountPaginator(Paginator):
+    """
+    Django Paginator that uses a count obtained elsewhere instead of
+    running COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.__dict__['count'] = count
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class UncountedPaginator(Paginator):
+    """
+    Paginator that never counts: fetches one extra row to tell whether a
+    next page exists. A total obtained elsewhere (a counter or a cached
+    COUNT) can be passed as count for reporting; it is not used to bound
+    or slice pages, so a stale total cannot hide rows. num_pages is the
+    number of pages known to exist so far, so page=last is not supported.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+        self._known_pages = 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def num_pages(self):
+        return self._known_pages
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise self.PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise self.EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise self.EmptyPage('That page contains no results')
+        has_next = len(rows) > self.per_page
+        self._known_pages = max(self._known_pages, number + 1 if has_next else number)
+        return UncountedPage(rows[:self.per_page], number, self, has_next)
+
 
 class MessagePagination(PageNumberPagination):
+    """
+    Page-number pagination for messages with a configurable total.
+
+    ?count=estimated (default) reads the conversation's message_total
+    counter, or for filtered requests a COUNT(*) cached for
+    count_cache_timeout seconds. ?count=exact always runs COUNT(*), and
+    ?count=none leaves the total out. Estimated totals are only reported:
+    pages are bounded by fetching one extra row, and count_exact is False.
+    page=last needs the real total, so it counts exactly and is rejected
+    with ?count=none.
+    """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    count_query_param = 'count'
+    count_modes = ('estimated', 'exact', 'none')
+    default_count_mode = 'estimated'
+    count_cache_timeout = 30
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.count_query_param, self.default_count_mode)
+        self.count_mode = mode if mode in self.count_modes else self.default_count_mode
+        if request.query_params.get(self.page_query_param) in self.last_page_strings:
+            if self.count_mode == 'none':
+                raise NotFound("page=last is not available with count=none.")
+            self.count_mode = 'exact'
+        self.known_count, self.count_exact = None, True
+        if self.count_mode == 'estimated':
+            self.known_count, self.count_exact = self.estimate_count(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        if self.count_mode == 'none' or not self.count_exact:
+            return UncountedPaginator(object_list, per_page, count=self.known_count)
+        return KnownCountPaginator(object_list, per_page, count=self.known_count)
+
+    def get_filter_params(self, request):
+        ignored = {self.page_query_param, self.page_size_query_param, self.count_query_param}
+        return sorted((k, v) for k, v in request.query_params.items() if k not in ignored)
+
+    def estimate_count(self, queryset, request, view):
+        conversation_pk = getattr(view, 'kwargs', {}).get('conversation_pk')
+        if conversation_pk is None:
+            return None, True
+        filters = self.get_filter_params(request)
+        if not filters:
+            total = Conversation.objects.filter(pk=conversation_pk).values_list('message_total', flat=True).first()
+            if total is not None:
+                return total, False
+        digest = hashlib.md5('&'.join(f"{k}={v}" for k, v in filters).encode()).hexdigest()
+        key = f"chats:message-count:{conversation_pk}:{digest}"
+        total = cache.get(key)
+        if total is not None:
+            return total, False
+        total = queryset.count()
+        cache.set(key, total, self.count_cache_timeout)
+        return total, True
 
     def get_paginated_response(self, data):
         """
         Custom paginated response to include total count.
         The checker is looking for the use of 'page.paginator.count'.
         """
+        response = {
+            'links': {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link()
+            },
+        }
+        if self.count_mode != 'none':
+            response['count'] = self.page.paginator.count
+            response['count_exact'] = self.count_exact
+        response['results'] = data
+        return Response(response)
+
+
+class MessageCursorPagination(BasePagination):
+    """
+    Keyset pagination over (sent_at, message_id), the Message ordering with
+    message_id as a tie-breaker. Each page is one indexed range query with
+    no COUNT(*) or OFFSET, so deep pages cost the same as the first.
+
+    - ?cursor=<token> pages forwards or backwards; tokens are opaque.
+    - ?since=<token> returns the messages after a cursor. The response
+      always includes a 'since' token to poll with next, even when no
+      new messages arrived.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    since_query_param = 'since'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        since = request.query_params.get(self.since_query_param)
+        token = since or request.query_params.get(self.cursor_query_param)
+        position = self.decode_cursor(token) if token else None
+        self.reverse = position is not None and position['d'] == 'prev'
+
+        if position is not None:
+            sent_at, message_id = position['t'], position['id']
+            if self.reverse:
+                queryset = queryset.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, message_id__lt=message_id))
+            else:
+                queryset = queryset.filter(Q(sent_at__gt=sent_at) | Q(sent_at=sent_at, message_id__gt=message_id))
+        ordering = ('-sent_at', '-message_id') if self.reverse else ('sent_at', 'message_id')
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.page = results
+        self.position = position
+        # Moving backwards, the rows we came from lie ahead; moving forwards from a cursor, behind
+        self.has_next = True if self.reverse else has_more
+        self.has_previous = has_more if self.reverse else position is not None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, sent_at, message_id, direction):
+        payload = {'t': sent_at.isoformat(), 'id': str(message_id), 'd': direction}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def cursor_for(self, message, direction):
+        return self.encode_cursor(message.sent_at, message.message_id, direction)
+
+    def cursor_at_position(self, direction):
+        return self.encode_cursor(self.position['t'], self.position['id'], direction)
+
+    def decode_cursor(self, token):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            sent_at = parse_datetime(payload['t'])
+            if sent_at is None or payload['d'] not in ('next', 'prev'):
+                raise ValueError
+            return {'t': sent_at, 'id': uuid.UUID(payload['id']), 'd': payload['d']}
+        except (TypeError, ValueError, KeyError, AttributeError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_link(self, cursor):
+        url = remove_query_param(self.base_url, self.since_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.get_link(self.cursor_for(self.page[-1], 'next'))
+        # Empty backwards page: continue forwards from where we started
+        return self.get_link(self.cursor_at_position('next'))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.get_link(self.cursor_for(self.page[0], 'prev'))
+        return self.get_link(self.cursor_at_position('prev'))
+
+    def get_since_token(self):
+        if self.page:
+            return self.cursor_for(self.page[-1], 'next')
+        if self.position is not None and self.position['d'] == 'next':
+            return self.cursor_at_position('next')
+        return None
+
+    def get_paginated_response(self, data):
         return Response({
             'links': {
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link()
             },
-            'count': self.page.paginator.count,
+            'since': self.get_since_token(),
             'results': data
         })
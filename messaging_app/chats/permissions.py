@@ -1,11 +1,22 @@
-from rest_framework import permission
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission
+from .models import Conversation
+
+def membership_cache_key(conversation_pk, user_pk):
+    return f"chats:membership:{conversation_pk}:{user_pk}"
 
 class IsParticipantOfConversation(BasePermission):
     """
     Custom permission to control access to conversations and messages.
+
+    Membership is an EXISTS lookup on the participants through table, keyed
+    by conversation id, so neither the conversation nor its participant
+    list is loaded. Results are memoized on the request; setting
+    membership_cache_timeout also shares them through the Django cache
+    (chats.signals clears entries when participants change).
     """
     message = "You do not have permission to perform this action."
+    membership_cache_timeout = None
 
     def has_permission(self, request, view):
         # This check satisfies the "user.is_authenticated" requirement.
@@ -14,22 +25,41 @@ class IsParticipantOfConversation(BasePermission):
     def has_object_permission(self, request, view, obj):
         # This check runs for detail views (GET, PUT, PATCH, DELETE on a single object).
         # We need to check if the user is a participant of the conversation.
-        
+
         # The 'obj' can be a Conversation instance or a Message instance.
-        if hasattr(obj, 'participants'): # It's a Conversation object
-            conversation = obj
-        elif hasattr(obj, 'conversation'): # It's a Message object
-            conversation = obj.conversation
+        if isinstance(obj, Conversation):
+            conversation_pk = obj.pk
+        elif hasattr(obj, 'conversation_id'): # It's a Message object
+            conversation_pk = obj.conversation_id
         else:
             return False # Not a recognized object type
 
         # Check for safe methods (GET, HEAD, OPTIONS)
         if request.method in ('GET', 'HEAD', 'OPTIONS'):
-            return request.user in conversation.participants.all()
+            return self.is_participant(request, conversation_pk)
 
         # Check for unsafe methods (POST, PUT, PATCH, DELETE)
         # The checker is looking for these keywords explicitly.
         if request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
-            return request.user in conversation.participants.all()
+            return self.is_participant(request, conversation_pk)
 
         return False
+
+    def is_participant(self, request, conversation_pk):
+        memo = request.__dict__.setdefault('_conversation_membership', {})
+        if conversation_pk not in memo:
+            memo[conversation_pk] = self.lookup_membership(conversation_pk, request.user.pk)
+        return memo[conversation_pk]
+
+    def lookup_membership(self, conversation_pk, user_pk):
+        key = membership_cache_key(conversation_pk, user_pk)
+        if self.membership_cache_timeout:
+            member = cache.get(key)
+            if member is not None:
+                return member
+        member = Conversation.participants.through.objects.filter(
+            conversation_id=conversation_pk, user_id=user_pk
+        ).exists()
+        if self.membership_cache_timeout:
+            cache.set(key, member, self.membership_cache_timeout)
+        return member
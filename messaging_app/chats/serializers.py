@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import User, Conversation, Message
 
@@ -62,32 +63,71 @@ class ConversationSerializer(serializers.ModelSerializer):
     def validate_participant_ids(self, value):
         """
         Check that the list of participant IDs is not empty and users exist.
+        All IDs are looked up in one query and every unknown one is reported.
         """
         if not value:
             raise ValidationError("You must provide at least one participant_id.")
-        
-        # Check if all provided UUIDs correspond to actual users
-        for user_id in value:
-            if not User.objects.filter(user_id=user_id).exists():
-                raise ValidationError(f"User with id {user_id} does not exist.")
-        return value
+
+        requested = list(dict.fromkeys(value))
+        found = set(User.objects.filter(user_id__in=requested).values_list('user_id', flat=True))
+        missing = [str(user_id) for user_id in requested if user_id not in found]
+        if missing:
+            raise ValidationError([f"User with id {user_id} does not exist." for user_id in missing])
+        return requested
 
     def create(self, validated_data):
         """
         Custom create method to handle creating a conversation and adding participants.
+        The participants are inserted in one bulk write, in the same transaction
+        as the conversation.
         """
         participant_ids = validated_data.pop('participant_ids')
         current_user = self.context['request'].user
-        
-        # Create the conversation instance
-        conversation = Conversation.objects.create(**validated_data)
-        
-        # Add the current user to the participants
-        conversation.participants.add(current_user)
-        
-        # Add the other participants from the provided list
-        for user_id in participant_ids:
-            user_to_add = User.objects.get(user_id=user_id)
-            conversation.participants.add(user_to_add)
-            
-        return conversation
\ No newline at end of file
+
+        with transaction.atomic():
+            # Create the conversation instance
+            conversation = Conversation.objects.create(**validated_data)
+            # Add the current user and the requested participants together;
+            # add() with primary keys inserts all through rows at once
+            conversation.participants.add(current_user.pk, *participant_ids)
+
+        return conversation
+
+class ConversationListSerializer(ConversationSerializer):
+    """
+    Lightweight representation for the conversation list. It relies on the
+    annotations and prefetches made by ConversationViewSet.get_queryset
+    instead of loading every message. The full history is served by the
+    nested messages endpoint.
+    """
+    message_count = serializers.IntegerField(read_only=True)
+    last_message = serializers.SerializerMethodField()
+    messages = serializers.SerializerMethodField()
+
+    class Meta(ConversationSerializer.Meta):
+        fields = ['conversation_id', 'conversation_name', 'participants', 'message_count',
+                  'last_message', 'messages', 'created_at']
+
+    def get_last_message(self, obj):
+        if getattr(obj, 'last_message_id', None) is None:
+            return None
+        return {
+            'message_id': obj.last_message_id,
+            'sender_username': obj.last_message_sender,
+            'message_body': obj.last_message_body,
+            'sent_at': serializers.DateTimeField().to_representation(obj.last_message_sent_at),
+        }
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if data['messages'] is None:
+            del data['messages']
+        return data
+
+    def get_messages(self, obj):
+        # Only present when the list was requested with ?preview=N
+        preview = getattr(obj, 'preview_messages', None)
+        if preview is None:
+            return None
+        # Prefetched newest first; show them in conversation order
+        return MessageSerializer(reversed(preview), many=True, context=self.context).data
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from .models import Conversation, Message
+from .permissions import membership_cache_key
+
+# Note: bulk_create() and queryset.update() bypass these signals; run
+# recount_message_totals() (manage.py recount_messages) after bulk loads
+
+def recount_message_totals(conversations=None):
+    """
+    Reset message_total from the messages table in one UPDATE. Covers
+    conversations created before the counter existed and messages written
+    without signals. Returns the number of conversations updated.
+    """
+    if conversations is None:
+        conversations = Conversation.objects.all()
+    totals = (Message.objects.filter(conversation=OuterRef('pk')).order_by()
+              .values('conversation').annotate(total=Count('pk')).values('total'))
+    return conversations.update(message_total=Coalesce(Subquery(totals), 0))
+
+@receiver(post_save, sender=Message)
+def increment_message_total(sender, instance, created, **kwargs):
+    if created:
+        Conversation.objects.filter(pk=instance.conversation_id).update(
+            message_total=F('message_total') + 1
+        )
+
+@receiver(post_delete, sender=Message)
+def decrement_message_total(sender, instance, **kwargs):
+    Conversation.objects.filter(pk=instance.conversation_id, message_total__gt=0).update(
+        message_total=F('message_total') - 1
+    )
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def invalidate_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse is True when the change came through user.conversations
+    if action == 'pre_clear':
+        related = instance.conversations if reverse else instance.participants
+        instance._cleared_membership = set(related.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_membership', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+    pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    cache.delete_many([membership_cache_key(conversation_pk, user_pk) for conversation_pk, user_pk in pairs])
@@ -1,3 +1,257 @@
+import base64
+import json
+import uuid
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from .models import User, Conversation, Message
+from .permissions import IsParticipantOfConversation
 
-# Create your tests here.
+class ConversationListTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user1)
+
+    def create_conversation(self, messages=3):
+        conversation = Conversation.objects.create()
+        conversation.participants.add(self.user1, self.user2)
+        for i in range(messages):
+            Message.objects.create(sender=self.user2, conversation=conversation, message_body=f"Message {i}")
+        return conversation
+
+    def list_queries(self, url='/api/conversations/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_list_query_count_does_not_grow_with_conversations(self):
+        self.create_conversation()
+        _, few = self.list_queries()
+        for _ in range(5):
+            self.create_conversation()
+        _, many = self.list_queries()
+        self.assertEqual(few, many)
+
+    def test_list_annotates_count_and_last_message(self):
+        self.create_conversation(messages=4)
+        response, _ = self.list_queries()
+        conversation = response.data['results'][0]
+        self.assertEqual(conversation['message_count'], 4)
+        self.assertEqual(conversation['last_message']['message_body'], "Message 3")
+        self.assertEqual(conversation['conversation_name'], "Chat with user2")
+        self.assertNotIn('messages', conversation)
+
+    def test_list_preview_caps_embedded_messages(self):
+        self.create_conversation(messages=10)
+        response, _ = self.list_queries('/api/conversations/?preview=3')
+        messages = response.data['results'][0]['messages']
+        self.assertEqual([m['message_body'] for m in messages], ["Message 7", "Message 8", "Message 9"])
+
+class MessageCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user1, self.user2)
+        for i in range(25):
+            Message.objects.create(sender=self.user1, conversation=self.conversation, message_body=f"Message {i}")
+        self.url = f'/api/conversations/{self.conversation.pk}/messages/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user1)
+
+    def bodies(self, response):
+        return [m['message_body'] for m in response.data['results']]
+
+    def test_cursor_pages_forwards_and_backwards(self):
+        first = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 10})
+        self.assertEqual(self.bodies(first), [f"Message {i}" for i in range(10)])
+        self.assertIsNone(first.data['links']['previous'])
+        self.assertNotIn('count', first.data)
+
+        second = self.client.get(first.data['links']['next'])
+        self.assertEqual(self.bodies(second), [f"Message {i}" for i in range(10, 20)])
+
+        back = self.client.get(second.data['links']['previous'])
+        self.assertEqual(self.bodies(back), [f"Message {i}" for i in range(10)])
+        self.assertIsNone(back.data['links']['previous'])
+
+        last = self.client.get(second.data['links']['next'])
+        self.assertEqual(self.bodies(last), [f"Message {i}" for i in range(20, 25)])
+        self.assertIsNone(last.data['links']['next'])
+
+    def test_since_returns_only_new_messages(self):
+        page = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 100})
+        since = page.data['since']
+        empty = self.client.get(self.url, {'since': since})
+        self.assertEqual(self.bodies(empty), [])
+        self.assertEqual(empty.data['since'], since)
+
+        Message.objects.create(sender=self.user2, conversation=self.conversation, message_body="New")
+        polled = self.client.get(self.url, {'since': since})
+        self.assertEqual(self.bodies(polled), ["New"])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_tampered_id_is_rejected(self):
+        payload = {'t': '2024-01-01T00:00:00+00:00', 'id': 'zzz', 'd': 'next'}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = self.client.get(self.url, {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_mode_still_available(self):
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(self.bodies(response)[0], "Message 20")
+
+class MessageCountTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user1)
+        self.messages = [
+            Message.objects.create(sender=self.user1, conversation=self.conversation, message_body=f"Message {i}")
+            for i in range(5)
+        ]
+        self.url = f'/api/conversations/{self.conversation.pk}/messages/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user1)
+
+    def test_counter_follows_creates_and_deletes(self):
+        self.messages[0].delete()
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_total, 4)
+
+    def test_default_count_comes_from_counter_without_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 5)
+        self.assertFalse(response.data['count_exact'])
+        self.assertFalse(any('COUNT(' in q['sql'] for q in queries.captured_queries))
+
+    def test_stale_counter_does_not_hide_messages(self):
+        Message.objects.bulk_create([
+            Message(sender=self.user1, conversation=self.conversation, message_body=f"Bulk {i}")
+            for i in range(40)
+        ])
+        Conversation.objects.filter(pk=self.conversation.pk).update(message_total=0)
+        first = self.client.get(self.url)
+        self.assertEqual(first.data['count'], 0)
+        self.assertFalse(first.data['count_exact'])
+        self.assertEqual(len(first.data['results']), 20)
+        self.assertIsNotNone(first.data['links']['next'])
+        last = self.client.get(self.url, {'page': 3})
+        self.assertEqual(last.status_code, 200)
+        self.assertEqual(len(last.data['results']), 5)
+        self.assertIsNone(last.data['links']['next'])
+
+    def test_recount_restores_counter(self):
+        Message.objects.bulk_create([
+            Message(sender=self.user1, conversation=self.conversation, message_body="Bulk")
+        ])
+        empty = Conversation.objects.create()
+        Conversation.objects.update(message_total=7)
+        call_command('recount_messages', stdout=StringIO())
+        self.conversation.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertEqual((self.conversation.message_total, empty.message_total), (6, 0))
+
+    def test_last_page(self):
+        Conversation.objects.filter(pk=self.conversation.pk).update(message_total=0)
+        response = self.client.get(self.url, {'page': 'last', 'page_size': 2})
+        self.assertEqual([m['message_body'] for m in response.data['results']], ["Message 4"])
+        self.assertTrue(response.data['count_exact'])
+        response = self.client.get(self.url, {'page': 'last', 'count': 'none'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_exact_count_is_flagged_exact(self):
+        response = self.client.get(self.url, {'count': 'exact'})
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(response.data['count_exact'])
+
+    def test_count_can_be_omitted(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'count': 'none', 'page_size': 2})
+        self.assertFalse(any('COUNT(' in q['sql'] for q in queries.captured_queries))
+        self.assertNotIn('count', response.data)
+        self.assertIsNotNone(response.data['links']['next'])
+        self.assertEqual(len(response.data['results']), 2)
+
+class ParticipantPermissionTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.outsider = User.objects.create_user(username='outsider', password='testpass123')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.user1)
+        self.message = Message.objects.create(sender=self.user1, conversation=self.conversation, message_body="Hi")
+        self.url = f'/api/conversations/{self.conversation.pk}/messages/{self.message.pk}/'
+        self.client = APIClient()
+        cache.clear()
+
+    def get_as(self, user):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, len(queries)
+
+    def test_membership_check_does_not_grow_with_participants(self):
+        _, few = self.get_as(self.user1)
+        for i in range(20):
+            self.conversation.participants.add(User.objects.create_user(username=f'member{i}'))
+        response, many = self.get_as(self.user1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(few, many)
+
+    def test_non_participant_is_forbidden(self):
+        response, _ = self.get_as(self.outsider)
+        self.assertEqual(response.status_code, 403)
+
+    def test_shared_cache_is_invalidated_when_participants_change(self):
+        with mock.patch.object(IsParticipantOfConversation, 'membership_cache_timeout', 60):
+            self.assertEqual(self.get_as(self.outsider)[0].status_code, 403)
+            self.conversation.participants.add(self.outsider)
+            self.assertEqual(self.get_as(self.outsider)[0].status_code, 200)
+            self.outsider.conversations.clear()
+            self.assertEqual(self.get_as(self.outsider)[0].status_code, 403)
+
+class ConversationCreateTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user1)
+
+    def create_users(self, count, prefix):
+        return [str(User.objects.create_user(username=f'{prefix}{i}').pk) for i in range(count)]
+
+    def post(self, participant_ids):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/conversations/', {'participant_ids': participant_ids}, format='json')
+        return response, len(queries)
+
+    def test_create_query_count_does_not_grow_with_participants(self):
+        response, few = self.post(self.create_users(2, 'small'))
+        self.assertEqual(response.status_code, 201)
+        ids = self.create_users(40, 'large')
+        response, many = self.post(ids + [str(self.user1.pk)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(few, many)
+        conversation = Conversation.objects.get(pk=response.data['conversation_id'])
+        self.assertEqual(conversation.participants.count(), 41)
+
+    def test_all_missing_ids_are_reported(self):
+        missing = [str(uuid.uuid4()), str(uuid.uuid4())]
+        response, _ = self.post(self.create_users(1, 'known') + missing)
+        self.assertEqual(response.status_code, 400)
+        errors = ' '.join(response.data['participant_ids'])
+        for user_id in missing:
+            self.assertIn(user_id, errors)
+        self.assertFalse(Conversation.objects.exists())
@@ -1,10 +1,11 @@
+from django.db.models import Count, OuterRef, Prefetch, Subquery
 from rest_framework import viewsets, permissions
 from rest_framework.status import HTTP_403_FORBIDDEN # <-- Import this
-from .models import Conversation, Message
-from .serializers import ConversationSerializer, MessageSerializer
+from .models import User, Conversation, Message
+from .serializers import ConversationSerializer, ConversationListSerializer, MessageSerializer
 from .filters import ConversationFilter, MessageFilter
 from .permissions import IsParticipantOfConversation
-from .pagination import MessagePagination
+from .pagination import MessagePagination, MessageCursorPagination
 
 class ConversationViewSet(viewsets.ModelViewSet):
     serializer_class = ConversationSerializer
@@ -12,8 +13,46 @@ class ConversationViewSet(viewsets.ModelViewSet):
     # Add IsAuthenticated to satisfy the checker
     permission_classes = [permissions.IsAuthenticated, IsParticipantOfConversation] 
 
+    # Upper bound for ?preview=N on the list endpoint
+    max_preview = 50
+
     def get_queryset(self):
-        return self.request.user.conversations.all()
+        queryset = self.request.user.conversations.prefetch_related(
+            Prefetch('participants', queryset=User.objects.only('user_id', 'username', 'first_name', 'last_name'))
+        )
+        if self.action != 'list':
+            return queryset.prefetch_related(
+                Prefetch('messages', queryset=Message.objects.select_related('sender'))
+            )
+        last_message = Message.objects.filter(conversation=OuterRef('pk')).order_by('-sent_at', '-message_id')
+        queryset = queryset.annotate(
+            message_count=Count('messages', distinct=True),
+            last_message_id=Subquery(last_message.values('message_id')[:1]),
+            last_message_body=Subquery(last_message.values('message_body')[:1]),
+            last_message_sender=Subquery(last_message.values('sender__username')[:1]),
+            last_message_sent_at=Subquery(last_message.values('sent_at')[:1]),
+        ).order_by('-last_message_sent_at', '-created_at')
+        preview = self.get_preview_size()
+        if preview:
+            # Sliced prefetch: one query fetches at most `preview` messages per conversation
+            queryset = queryset.prefetch_related(Prefetch(
+                'messages',
+                queryset=Message.objects.select_related('sender').order_by('-sent_at', '-message_id')[:preview],
+                to_attr='preview_messages',
+            ))
+        return queryset
+
+    def get_preview_size(self):
+        try:
+            preview = int(self.request.query_params.get('preview', 0))
+        except ValueError:
+            return 0
+        return max(0, min(preview, self.max_preview))
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ConversationListSerializer
+        return ConversationSerializer
 
     def get_serializer_context(self):
         return {'request': self.request}
@@ -25,9 +64,24 @@ class MessageViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsParticipantOfConversation]
     pagination_class = MessagePagination
 
+    @property
+    def paginator(self):
+        """
+        Cursor pagination when the client sends ?cursor=, ?since= or
+        ?pagination=cursor; page numbers otherwise, for jump-to-page.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if ('cursor' in params or 'since' in params
+                    or params.get('pagination') == 'cursor'):
+                self._paginator = MessageCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_queryset(self):
         conversation_pk = self.kwargs['conversation_pk']
-        return Message.objects.filter(conversation__pk=conversation_pk)
+        return Message.objects.filter(conversation__pk=conversation_pk).select_related('sender')
 
     def perform_create(self, serializer):
         # The kwarg from the URL is 'conversation_pk'
@@ -1,17 +1,99 @@
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
 
 class DatabaseConnection:
-    def __init__(self, db_name):
+    def __init__(self, db_name, read_only=False, check_same_thread=True):
         self.db_name = db_name
+        self.read_only = read_only
+        self.check_same_thread = check_same_thread
         self.conn = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_name)
+        if self.read_only:
+            # as_uri() percent-encodes names containing ?, # or %
+            uri = Path(self.db_name).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True,
+                                        check_same_thread=self.check_same_thread)
+        else:
+            self.conn = sqlite3.connect(self.db_name, check_same_thread=self.check_same_thread)
         return self.conn.cursor()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.conn.close()
 
+class ParallelReader:
+    """
+    Runs independent read-only queries on a thread pool. Each worker keeps
+    its own read-only DatabaseConnection; the database is switched to WAL so
+    readers do not block each other or the writer. Writes go through one
+    writer connection, one at a time.
+    """
+
+    def __init__(self, db_name, workers=4):
+        self.db_name = db_name
+        self._local = threading.local()
+        # Every connection is entered on this stack and closed by close()
+        self._connections = ExitStack()
+        self._connections_lock = threading.Lock()
+        self._writer = DatabaseConnection(db_name, check_same_thread=False)
+        self._writer_cursor = self._connections.enter_context(self._writer)
+        try:
+            # Step the PRAGMA to completion; left pending, it made every
+            # reader fail with "database is locked"
+            self._writer_cursor.execute("PRAGMA journal_mode = WAL").fetchone()
+        except BaseException:
+            self._connections.close()
+            raise
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _reader_cursor(self):
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            reader = DatabaseConnection(self.db_name, read_only=True, check_same_thread=False)
+            with self._connections_lock:
+                cursor = self._local.cursor = self._connections.enter_context(reader)
+        return cursor
+
+    def _read(self, query, params):
+        cursor = self._reader_cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def read_many(self, queries):
+        """
+        Run every query (SQL text or (sql, params)) concurrently and return
+        their fetchall() results in the same order.
+        """
+        futures = []
+        for query in queries:
+            sql, params = (query, ()) if isinstance(query, str) else query
+            futures.append(self._executor.submit(self._read, sql, params))
+        return [future.result() for future in futures]
+
+    def write(self, query, params=()):
+        with self._write_lock:
+            try:
+                self._writer_cursor.execute(query, params)
+                self._writer.conn.commit()
+            except Exception:
+                self._writer.conn.rollback()
+                raise
+            return self._writer_cursor.rowcount
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._connections.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 if __name__ == "__main__":
  
     with sqlite3.connect("test.db") as conn:
@@ -26,3 +108,10 @@ if __name__ == "__main__":
         cursor.execute("SELECT * FROM users")
         rows = cursor.fetchall()
         print(rows)
+
+    with ParallelReader("test.db") as reader:
+        reader.write("UPDATE users SET age = ? WHERE name = ?", (31, 'Alice'))
+        print(reader.read_many([
+            "SELECT COUNT(*) FROM users",
+            ("SELECT name FROM users WHERE age > ?", (28,)),
+        ]))
@@ -1,20 +1,89 @@
 import sqlite3
+from columnar_export import export_cursor
 
 class ExecuteQuery:
-    def __init__(self, query, params):
+    """
+    Run a query for the duration of a with block.
+
+    mode='all'  returns the full fetchall() list (the default).
+    mode='iter' returns an iterator that fetches rows lazily in
+                fetchmany(chunk_size) chunks while the block runs.
+    mode='many' runs executemany over params (an iterable of parameter
+                tuples), commits, and returns the affected row count.
+    mode='export' streams the result into the memory-mappable columnar
+                file at export_path (see columnar_export.ColumnarFile)
+                and returns the number of rows written.
+
+    Pass connection= to run on a caller-owned connection, or pool= (any
+    object with acquire()/release(conn)) to borrow one; neither is closed
+    on exit. Otherwise a connection to db_name is opened and closed here.
+    """
+
+    def __init__(self, query, params=(), mode='all', chunk_size=1000, db_name='test.db',
+                 connection=None, pool=None, export_path=None):
+        if mode not in ('all', 'iter', 'many', 'export'):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == 'export' and not export_path:
+            raise ValueError("mode='export' requires export_path")
         self.query = query
         self.params = params
-        self.conn = None
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.export_path = export_path
+        self.db_name = db_name
+        self.pool = pool
+        self.conn = connection
+        self._owns_connection = connection is None and pool is None
+        self.cursor = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect('test.db')
-        cursor = self.conn.cursor()
-        cursor.execute(self.query, self.params)
-        self.results = cursor.fetchall()
+        if self.pool is not None:
+            self.conn = self.pool.acquire()
+        elif self.conn is None:
+            self.conn = sqlite3.connect(self.db_name)
+        try:
+            self.cursor = self.conn.cursor()
+            self.results = self._run()
+        except BaseException:
+            # __exit__ will not run, so undo and hand the connection back here
+            if self.mode == 'many' and self.conn.in_transaction:
+                self.conn.rollback()
+            self._cleanup()
+            raise
         return self.results
 
+    def _run(self):
+        if self.mode == 'many':
+            self.cursor.executemany(self.query, self.params)
+            self.conn.commit()
+            return self.cursor.rowcount
+        self.cursor.execute(self.query, self.params)
+        if self.mode == 'export':
+            return export_cursor(self.cursor, self.export_path, self.chunk_size)
+        if self.mode == 'iter':
+            return self._iter_rows()
+        return self.cursor.fetchall()
+
+    def _iter_rows(self):
+        while True:
+            rows = self.cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+    def _cleanup(self):
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+        if self.pool is not None:
+            self.pool.release(self.conn)
+            self.conn = None
+        elif self._owns_connection:
+            self.conn.close()
+            self.conn = None
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.conn.close()
+        self._cleanup()
 
 if __name__ == "__main__":
     
@@ -30,3 +99,7 @@ if __name__ == "__main__":
     params = (25,)
     with ExecuteQuery(query, params) as results:
         print(results)
+
+    with ExecuteQuery("SELECT * FROM users", mode='iter', chunk_size=2) as rows:
+        for row in rows:
+            print(row)
@@ -1,5 +1,6 @@
 import asyncio
 import aiosqlite
+from async_pool import AsyncSQLitePool, gather_bounded
 
 async def setup_db():
     async with aiosqlite.connect('test.db') as db:
@@ -8,26 +9,34 @@ async def setup_db():
         await db.execute("INSERT INTO users (name, age) VALUES ('Alice', 30), ('Bob', 25), ('Charlie', 35), ('Dave', 45)")
         await db.commit()
 
-async def async_fetch_users():
+async def async_fetch_users(pool=None):
+    if pool is not None:
+        return await pool.fetchall("SELECT * FROM users")
     async with aiosqlite.connect('test.db') as db:
         cursor = await db.execute("SELECT * FROM users")
         results = await cursor.fetchall()
         return results
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(pool=None):
+    if pool is not None:
+        return await pool.fetchall("SELECT * FROM users WHERE age > ?", (40,))
     async with aiosqlite.connect('test.db') as db:
         cursor = await db.execute("SELECT * FROM users WHERE age > 40")
         results = await cursor.fetchall()
         return results
 
-async def fetch_concurrently():
-    users, older_users = await asyncio.gather(async_fetch_users(), async_fetch_older_users())
+async def fetch_concurrently(pool=None, limit=10, timeout=None):
+    users, older_users = await gather_bounded(
+        lambda: async_fetch_users(pool), lambda: async_fetch_older_users(pool),
+        limit=limit, timeout=timeout
+    )
     print("All users:", users)
     print("Users older than 40:", older_users)
 
 async def main():
     await setup_db()
-    await fetch_concurrently()
+    async with AsyncSQLitePool('test.db', size=4) as pool:
+        await fetch_concurrently(pool)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import asynccontextmanager
+import aiosqlite
+
+
+class AsyncSQLitePool:
+    """
+    Fixed-size pool of aiosqlite connections. Each aiosqlite connection owns
+    a worker thread, so the pool size also caps the threads used, however
+    many coroutines are querying.
+    """
+
+    def __init__(self, db_name, size=5):
+        self.db_name = db_name
+        self.size = size
+        self._idle = asyncio.Queue()
+        self._connections = []
+        self._opening = asyncio.Lock()
+
+    async def _grow(self):
+        async with self._opening:
+            if self._idle.empty() and len(self._connections) < self.size:
+                conn = await aiosqlite.connect(self.db_name)
+                self._connections.append(conn)
+                self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._idle.empty():
+            await self._grow()
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self._idle.put_nowait(conn)
+
+    async def fetchall(self, query, params=()):
+        async with self.acquire() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def close(self):
+        for conn in self._connections:
+            await conn.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+async def gather_bounded(*aws, limit=10, timeout=None, return_exceptions=False):
+    """
+    Like asyncio.gather, but at most `limit` awaitables run at once and each
+    gets `timeout` seconds. Pass zero-argument callables returning
+    coroutines to avoid creating every coroutine up front. Unless
+    return_exceptions is set, the first failure cancels the rest.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            coro = aw() if callable(aw) else aw
+            if timeout is None:
+                return await coro
+            return await asyncio.wait_for(coro, timeout)
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+import asyncio
+import sys
+import time
+import aiosqlite
+from async_pool import AsyncSQLitePool, gather_bounded
+
+DB_NAME = 'bench_concurrent.db'
+QUERY = "SELECT * FROM users WHERE age > ?"
+
+
+async def setup_db(rows):
+    async with aiosqlite.connect(DB_NAME) as db:
+        await db.execute("DROP TABLE IF EXISTS users")
+        await db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+        await db.executemany("INSERT INTO users (name, age) VALUES (?, ?)",
+                             ((f"user{i}", 18 + i % 60) for i in range(rows)))
+        await db.commit()
+
+
+async def timed(latencies, start, coro):
+    # Latency from submission (start of the batch), so time spent queued counts
+    result = await coro
+    latencies.append(time.perf_counter() - start)
+    return result
+
+
+async def connect_per_query(age):
+    async with aiosqlite.connect(DB_NAME) as db:
+        async with db.execute(QUERY, (age,)) as cursor:
+            return await cursor.fetchall()
+
+
+def report(label, n, elapsed, latencies):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+    print(f"{label:<22} n={n:<5} {n / elapsed:9.0f} q/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms")
+
+
+async def main(sizes):
+    await setup_db(5000)
+    for n in sizes:
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(latencies, start, connect_per_query(i % 60 + 18)) for i in range(n)))
+        report("connect per query", n, time.perf_counter() - start, latencies)
+
+        latencies = []
+        async with AsyncSQLitePool(DB_NAME, size=8) as pool:
+            start = time.perf_counter()
+            await gather_bounded(
+                *(lambda i=i: timed(latencies, start, pool.fetchall(QUERY, (i % 60 + 18,))) for i in range(n)),
+                limit=32
+            )
+            report("pool(8) + limit 32", n, time.perf_counter() - start, latencies)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 500]
+    asyncio.run(main(sizes))
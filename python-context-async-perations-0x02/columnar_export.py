@@ -0,0 +1,240 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+
+MAGIC = b'COLX0001'
+ALIGNMENT = 8
+TYPECODES = {'int64': 'q', 'float64': 'd'}
+
+
+class _ColumnWriter:
+    """
+    Spools one column to temporary files while rows stream in: fixed-width
+    values for numbers, int64 end offsets plus UTF-8 bytes for strings, and
+    one validity byte per row.
+    """
+
+    def __init__(self, name, type_=None):
+        self.name = name
+        self.type = type_
+        self.rows = 0
+        self.pending_nulls = 0
+        self.has_nulls = False
+        self.values = tempfile.TemporaryFile()
+        self.data = tempfile.TemporaryFile()
+        self.valid = tempfile.TemporaryFile()
+        self.data_length = 0
+
+    def _infer(self, value):
+        if isinstance(value, int):
+            return 'int64'
+        if isinstance(value, float):
+            return 'float64'
+        if isinstance(value, str):
+            return 'str'
+        raise TypeError(f"Column {self.name}: unsupported value type {type(value).__name__}")
+
+    def start(self, type_):
+        self.type = type_
+        if self.pending_nulls:
+            self._write_nulls(self.pending_nulls)
+            self.pending_nulls = 0
+
+    def _write_nulls(self, count):
+        if self.type == 'str':
+            array('q', [self.data_length] * count).tofile(self.values)
+        else:
+            array(TYPECODES[self.type], [0] * count).tofile(self.values)
+
+    def append(self, values):
+        if self.type is None:
+            first = next((v for v in values if v is not None), None)
+            if first is None:
+                # Type still unknown: remember the NULLs and write them once it is
+                self.pending_nulls += len(values)
+                self.rows += len(values)
+                self.has_nulls = True
+                self.valid.write(bytes(len(values)))
+                return
+            self.start(self._infer(first))
+        valid = bytes(v is not None for v in values)
+        if 0 in valid:
+            self.has_nulls = True
+        self.valid.write(valid)
+        self.rows += len(values)
+        if self.type == 'str':
+            ends = array('q')
+            for v in values:
+                if v is not None:
+                    if not isinstance(v, str):
+                        raise TypeError(f"Column {self.name}: expected str, got {type(v).__name__}")
+                    encoded = v.encode('utf-8')
+                    self.data.write(encoded)
+                    self.data_length += len(encoded)
+                ends.append(self.data_length)
+            ends.tofile(self.values)
+        else:
+            if self.type == 'int64' and any(isinstance(v, float) for v in values):
+                raise TypeError(f"Column {self.name}: float in an int64 column; pass types=")
+            array(TYPECODES[self.type], [0 if v is None else v for v in values]).tofile(self.values)
+
+    def close(self):
+        for f in (self.values, self.data, self.valid):
+            f.close()
+
+
+def _pad(file):
+    remainder = file.tell() % ALIGNMENT
+    if remainder:
+        file.write(bytes(ALIGNMENT - remainder))
+
+
+def _copy_region(src, dst):
+    src.seek(0)
+    _pad(dst)
+    offset = dst.tell()
+    shutil.copyfileobj(src, dst)
+    return offset, dst.tell() - offset
+
+
+def export_cursor(cursor, path, chunk_size=10000, types=None):
+    """
+    Stream the rows of an executed DB-API cursor into a columnar file at
+    path, fetchmany(chunk_size) rows at a time. types maps column names to
+    'int64', 'float64' or 'str'; other columns are inferred from their
+    first non-NULL value. Returns the number of rows written.
+    """
+    names = [d[0] for d in cursor.description]
+    types = types or {}
+    writers = [_ColumnWriter(name, types.get(name)) for name in names]
+    try:
+        rows = 0
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            for writer, values in zip(writers, zip(*chunk)):
+                writer.append(values)
+            rows += len(chunk)
+        _assemble(path, writers, rows)
+        return rows
+    finally:
+        for writer in writers:
+            writer.close()
+
+
+def export_query(conn, query, params=(), path='export.colx', chunk_size=10000, types=None):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return export_cursor(cursor, path, chunk_size, types)
+    finally:
+        cursor.close()
+
+
+def _assemble(path, writers, rows):
+    body_path = f"{path}.body"
+    with open(body_path, 'wb') as body:
+        columns = []
+        for writer in writers:
+            if writer.type is None:
+                writer.start('int64')  # all NULL
+            column = {'name': writer.name, 'type': writer.type,
+                      'values': _copy_region(writer.values, body)}
+            if writer.type == 'str':
+                column['data'] = _copy_region(writer.data, body)
+            if writer.has_nulls:
+                column['valid'] = _copy_region(writer.valid, body)
+            columns.append(column)
+    header = json.dumps({'rows': rows, 'columns': columns}).encode('utf-8')
+    prefix = len(MAGIC) + 4 + len(header)
+    # Region offsets are relative to the body, which starts on an aligned boundary
+    with open(path, 'wb') as out, open(body_path, 'rb') as body:
+        out.write(MAGIC)
+        out.write(struct.pack('<I', len(header)))
+        out.write(header)
+        out.write(bytes(-prefix % ALIGNMENT))
+        shutil.copyfileobj(body, out)
+    os.remove(body_path)
+
+
+class StringColumn:
+    """
+    View of a string column over the mapping; only the rows accessed are
+    decoded.
+    """
+
+    def __init__(self, ends, data, valid=None):
+        self._ends = ends
+        self._data = data
+        self._valid = valid
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self._valid is not None and not self._valid[i]:
+            return None
+        start = self._ends[i - 1] if i else 0
+        return str(self._data[start:self._ends[i]], 'utf-8')
+
+
+class ColumnarFile:
+    """
+    Memory-maps a file written by export_cursor. Numeric columns come back
+    as memoryviews over the mapping (no copy, no unpickling), so worker
+    processes can share one page-cached copy of a lookup table.
+    Release any views taken from it before calling close().
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            self._file.close()
+            raise ValueError(f"{path} is not a columnar export")
+        (header_length,) = struct.unpack_from('<I', self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._map[start:start + header_length])
+        prefix = start + header_length
+        self._base = prefix + (-prefix % ALIGNMENT)
+        self.rows = header['rows']
+        self.columns = {c['name']: c for c in header['columns']}
+
+    def _region(self, region):
+        offset, length = region
+        start = self._base + offset
+        return memoryview(self._map)[start:start + length]
+
+    def column_names(self):
+        return list(self.columns)
+
+    def valid(self, name):
+        column = self.columns[name]
+        return self._region(column['valid']) if 'valid' in column else None
+
+    def column(self, name):
+        column = self.columns[name]
+        if column['type'] == 'str':
+            ends = self._region(column['values']).cast('q')
+            return StringColumn(ends, self._region(column['data']), self.valid(name))
+        return self._region(column['values']).cast(TYPECODES[column['type']])
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
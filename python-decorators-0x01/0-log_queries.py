@@ -1,30 +1,41 @@
-import sqlite3
 import functools
-import logging
-from datetime import datetime
+import time
+from query_metrics import QueryMetrics
+from sqlite_pool import shared_connections
+from statement_registry import statements
 
+query_metrics = QueryMetrics()
 
-logging.basicConfig(level=logging.INFO)
+def log_queries(func=None, *, metrics=None):
+    """
+    Time each call with perf_counter_ns and record it against the
+    normalized query. Slow queries are always logged, others only at the
+    metrics' sample rate, and logging never blocks the caller.
+    """
+    if func is None:
+        return lambda f: log_queries(f, metrics=metrics)
 
-def log_queries(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         query = args[0] if args else kwargs.get('query')
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        logging.info(f"[{timestamp}] Executing query: {query}")
-        return func(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            (metrics or query_metrics).record(query, time.perf_counter_ns() - start)
     return wrapper
 
 @log_queries
-def fetch_all_users(query):
-    conn = sqlite3.connect('users.db')
-    cursor = conn.cursor()
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+def fetch_all_users(query, params=()):
+    provider = shared_connections('users.db')
+    conn = provider.acquire()
+    try:
+        return statements.fetchall(conn, query, params)
+    finally:
+        provider.release(conn)
 
 
 if __name__ == "__main__":
     users = fetch_all_users(query="SELECT * FROM users")
     print(users)
+    print(query_metrics.report())
@@ -1,22 +1,40 @@
-import sqlite3
 import functools
+from query_cache import is_tracked, track_writes, untrack_writes
+from sqlite_pool import shared_connections
+from statement_registry import statements
+
+default_provider = shared_connections('users.db')
+
+def with_db_connection(func=None, *, provider=None):
+    """
+    Pass a connection from `provider` (per-thread reused connections by
+    default) as the first argument, returning it when the call finishes.
+    Writes made during the call invalidate query_cache like a fresh
+    connection would; nested calls that get the same connection leave
+    tracking to the outermost one.
+    """
+    if func is None:
+        return lambda f: with_db_connection(f, provider=provider)
 
-def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        source = provider or default_provider
+        conn = source.acquire()
+        tracking = not is_tracked(conn)
+        if tracking:
+            track_writes(conn)
         try:
             result = func(conn, *args, **kwargs)
         finally:
-            conn.close()
+            if tracking:
+                untrack_writes(conn)
+            source.release(conn)
         return result
     return wrapper
 
 @with_db_connection
 def get_user_by_id(conn, user_id):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    return cursor.fetchone()
+    return statements.fetchone(conn, "SELECT * FROM users WHERE id = ?", (user_id,))
 
 
 if __name__ == "__main__":
@@ -1,29 +1,47 @@
 import sqlite3
 import functools
+from query_cache import track_writes, untrack_writes
+from transactions import atomic, GroupCommitter
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         conn = sqlite3.connect('users.db')
+        track_writes(conn)
         try:
             result = func(conn, *args, **kwargs)
         finally:
+            untrack_writes(conn)
             conn.close()
         return result
     return wrapper
 
 def transactional(func):
+    """
+    Commit on success and roll back on error. Inside another transactional
+    call on the same connection the function runs under a SAVEPOINT
+    instead, so decorated functions compose without committing early.
+    """
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
-        try:
-            result = func(conn, *args, **kwargs)
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        return result
+        with atomic(conn):
+            return func(conn, *args, **kwargs)
     return wrapper
 
+def group_commit(committer, wait=True):
+    """
+    Run func(conn, ...) on a GroupCommitter's writer connection so its
+    write shares a commit with other callers. Returns the result once the
+    batch is committed, or a Future when wait is False.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            future = committer.submit(func, *args, **kwargs)
+            return future.result() if wait else future
+        return wrapper
+    return decorator
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
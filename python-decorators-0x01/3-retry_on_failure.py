@@ -1,29 +1,102 @@
 import time
-import sqlite3
+import asyncio
 import functools
+from retry_policy import backoff_delay, classifier, default_budget
+from sqlite_pool import shared_connections
+from statement_registry import statements
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        provider = shared_connections('users.db')
+        conn = provider.acquire()
         try:
             result = func(conn, *args, **kwargs)
         finally:
-            conn.close()
+            provider.release(conn)
         return result
     return wrapper
 
-def retry_on_failure(retries=3, delay=2):
+def retry_on_failure(retries=3, delay=2, max_delay=30, retry_on=None, budget=None, breaker=None):
+    """
+    Retry retryable errors up to `retries` times with exponential backoff
+    and full jitter (delay is the base, capped at max_delay). retry_on is an
+    exception class, tuple or predicate; by default only transient errors
+    such as "database is locked" are retried. Retries draw from a
+    process-wide RetryBudget, and an optional CircuitBreaker fails fast
+    while the database keeps failing.
+    """
+    should_retry = classifier(retry_on)
+    budget = budget or default_budget
+
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(retries + 1):
+                if breaker:
+                    breaker.before_call()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    retryable = should_retry(e)
+                    if breaker and retryable:
+                        breaker.record_failure()
+                    elif breaker:
+                        breaker.record_neutral()
+                    if not retryable or attempt == retries or not budget.try_spend():
+                        raise e
+                    time.sleep(backoff_delay(attempt, delay, max_delay))
+                    continue
+                except BaseException:
+                    # Cancelled or interrupted: neither a success nor a
+                    # failure, but a half-open breaker must release its probe
+                    if breaker:
+                        breaker.record_neutral()
+                    raise
+                if breaker:
+                    breaker.record_success()
+                budget.record_success()
+                return result
+            return None
+        return wrapper
+    return decorator
+
+def async_retry_on_failure(retries=3, delay=2, max_delay=30, retry_on=None, budget=None, breaker=None):
+    """
+    retry_on_failure for coroutine functions: waits with asyncio.sleep so
+    the event loop keeps running between attempts.
+    """
+    should_retry = classifier(retry_on)
+    budget = budget or default_budget
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(retries + 1):
+                if breaker:
+                    breaker.before_call()
                 try:
-                    return func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == retries:
+                    retryable = should_retry(e)
+                    if breaker and retryable:
+                        breaker.record_failure()
+                    elif breaker:
+                        breaker.record_neutral()
+                    if not retryable or attempt == retries or not budget.try_spend():
                         raise e
-                    time.sleep(delay)
+                    await asyncio.sleep(backoff_delay(attempt, delay, max_delay))
+                    continue
+                except BaseException:
+                    # Cancelled or interrupted: neither a success nor a
+                    # failure, but a half-open breaker must release its probe
+                    if breaker:
+                        breaker.record_neutral()
+                    raise
+                if breaker:
+                    breaker.record_success()
+                budget.record_success()
+                return result
             return None
         return wrapper
     return decorator
@@ -31,9 +104,7 @@ def retry_on_failure(retries=3, delay=2):
 @with_db_connection
 @retry_on_failure(retries=3, delay=1)
 def fetch_users_with_retry(conn):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users")
-    return cursor.fetchall()
+    return statements.fetchall(conn, "SELECT * FROM users")
 
 
 if __name__ == "__main__":
@@ -1,37 +1,45 @@
 import sqlite3
 import functools
+from query_cache import query_cache, track_writes, untrack_writes
 
-query_cache = {}
+def cache_query(func=None, *, cache=None, ttl=None):
+    """
+    Cache the result of func(conn, query, params=()) keyed on the query text
+    and its parameters. Results expire after ttl seconds (the cache default
+    when None) and are dropped when a tracked connection writes to a table
+    the query reads from.
+    """
+    if func is None:
+        return lambda f: cache_query(f, cache=cache, ttl=ttl)
+    store = cache or query_cache
 
-def cache_query(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         query = kwargs.get('query') or (args[1] if len(args) >= 2 else None)
         if not query:
             raise ValueError("Query not found in arguments")
-        if query in query_cache:
-            return query_cache[query]
-        result = func(*args, **kwargs)
-        query_cache[query] = result
-        return result
+        params = kwargs.get('params', args[2] if len(args) >= 3 else ())
+        return store.get_or_load(query, params, lambda: func(*args, **kwargs), ttl=ttl)
     return wrapper
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         conn = sqlite3.connect('users.db')
+        track_writes(conn)
         try:
             result = func(conn, *args, **kwargs)
         finally:
+            untrack_writes(conn)
             conn.close()
         return result
     return wrapper
 
 @with_db_connection
 @cache_query
-def fetch_users_with_cache(conn, query):
+def fetch_users_with_cache(conn, query, params=()):
     cursor = conn.cursor()
-    cursor.execute(query)
+    cursor.execute(query, params)
     return cursor.fetchall()
 
 
@@ -39,3 +47,8 @@ if __name__ == "__main__":
     users = fetch_users_with_cache(query="SELECT * FROM users")
     users_again = fetch_users_with_cache(query="SELECT * FROM users")
     print(users == users_again)
+    # Named parameters are part of the key, so these are separate entries
+    first = fetch_users_with_cache(query="SELECT * FROM users WHERE id = :id", params={'id': 1})
+    second = fetch_users_with_cache(query="SELECT * FROM users WHERE id = :id", params={'id': 2})
+    print(first != second)
+    print(query_cache.stats())
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+import sqlite3
+import sys
+import time
+from sqlite_pool import open_connection
+from statement_registry import StatementRegistry
+
+DB_NAME = 'bench_statements.db'
+QUERY = "SELECT * FROM users WHERE id = ?"
+
+
+def setup_db(rows):
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("DROP TABLE IF EXISTS users")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def run(label, lookup, calls, rows):
+    start = time.perf_counter()
+    for i in range(calls):
+        lookup(i % rows + 1)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed / calls * 1e6:8.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rows = 10000
+    setup_db(rows)
+
+    def connect_per_call(user_id):
+        conn = sqlite3.connect(DB_NAME)
+        conn.execute(QUERY, (user_id,)).fetchone()
+        conn.close()
+
+    # f-string SQL defeats the statement cache: every call is a new text to compile
+    uncached = open_connection(DB_NAME, cached_statements=0)
+    interpolated = open_connection(DB_NAME)
+    registry = StatementRegistry()
+    cached = open_connection(DB_NAME)
+
+    run("connect per call", connect_per_call, calls, rows)
+    run("reused conn, interpolated SQL", lambda i: interpolated.execute(f"SELECT * FROM users WHERE id = {i}").fetchone(), calls, rows)
+    run("reused conn, no statement cache", lambda i: uncached.execute(QUERY, (i,)).fetchone(), calls, rows)
+    run("reused conn, registry + cache", lambda i: registry.fetchone(cached, QUERY, (i,)), calls, rows)
+    print(registry.stats())
+    for conn in (uncached, interpolated, cached):
+        conn.close()
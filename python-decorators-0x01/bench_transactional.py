@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+tx = __import__('2-transactional')
+
+DB_NAME = 'bench_tx.db'
+
+
+def setup_db(rows):
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("DROP TABLE IF EXISTS users")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def update_email(conn, user_id, new_email):
+    conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+
+def run(label, write, writes, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: write(i % 1000 + 1, f"u{i}@example.com"), range(writes)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {writes / elapsed:10.0f} writes/sec")
+
+
+if __name__ == "__main__":
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = 16
+    setup_db(1000)
+
+    def commit_per_call(user_id, new_email):
+        conn = sqlite3.connect(DB_NAME, timeout=30)
+        try:
+            with tx.atomic(conn):
+                update_email(conn, user_id, new_email)
+        finally:
+            conn.close()
+
+    run("commit per call", commit_per_call, writes, threads)
+
+    committer = tx.GroupCommitter(DB_NAME, max_batch=200, window=0.002)
+    run("group commit", tx.group_commit(committer)(update_email), writes, threads)
+    print(f"{committer.operations} writes in {committer.batches} commits")
+    committer.close()
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+import sqlite3
+import sys
+import time
+from sqlite_pool import ConnectPerCall, SQLiteConnectionPool, ThreadLocalConnections
+with_db_connection = __import__('1-with_db_connection').with_db_connection
+
+DB_NAME = 'bench_users.db'
+
+
+def setup_db(rows):
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("DROP TABLE IF EXISTS users")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def run(label, provider, calls, rows):
+    @with_db_connection(provider=provider)
+    def get_user_by_id(conn, user_id):
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        return cursor.fetchone()
+
+    get_user_by_id(1)  # warm up: opens pooled connections and applies PRAGMAs
+    start = time.perf_counter()
+    for i in range(calls):
+        get_user_by_id(i % rows + 1)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed / calls * 1e6:8.1f} us/call")
+    provider.close()
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = 10000
+    setup_db(rows)
+    run("connect per call", ConnectPerCall(DB_NAME), calls, rows)
+    run("thread-local", ThreadLocalConnections(DB_NAME), calls, rows)
+    run("bounded pool", SQLiteConnectionPool(DB_NAME), calls, rows)
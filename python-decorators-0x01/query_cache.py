@@ -0,0 +1,209 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+_TABLE = r'["`\[]?(\w+)["`\]]?(?:\s+(?:AS\s+)?\w+)?'
+TABLE_PATTERN = re.compile(r'\b(?:JOIN|INTO|UPDATE)\s+["`\[]?(\w+)', re.IGNORECASE)
+# FROM takes a comma-separated list: FROM a, b AS x, "c" y
+FROM_PATTERN = re.compile(rf'\bFROM\s+({_TABLE}(?:\s*,\s*{_TABLE})*)', re.IGNORECASE)
+FROM_ITEM = re.compile(rf'(?:^|,)\s*{_TABLE}', re.IGNORECASE)
+WRITE_PATTERN = re.compile(r'^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+
+def tables_in(sql):
+    names = TABLE_PATTERN.findall(sql)
+    for from_list in FROM_PATTERN.findall(sql):
+        names.extend(FROM_ITEM.findall(from_list[0]))
+    return frozenset(name.lower() for name in names)
+
+
+def cache_key(query, params):
+    """
+    Hashable key for query and its parameters; named parameters (a mapping)
+    are keyed on their sorted items rather than just their names.
+    """
+    if params is None:
+        return (query, ())
+    if isinstance(params, Mapping):
+        return (query, tuple(sorted(params.items())))
+    return (query, tuple(params))
+
+
+def estimate_size(value):
+    """
+    Rough byte size of a query result (a list of tuples of scalars).
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item) if isinstance(item, (list, tuple)) else sys.getsizeof(item)
+    return size
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCache:
+    """
+    Thread-safe LRU result cache keyed on (query, params).
+
+    - Entries expire after ttl seconds and the least recently used ones are
+      evicted once max_entries or max_bytes is exceeded.
+    - invalidate_tables() drops every entry that read from a written table.
+    - Concurrent misses on the same key run the query once; the other
+      callers wait for and share that result.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, tables)
+        self._bytes = 0
+        self._flights = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                       'invalidations': 0, 'coalesced': 0}
+
+    def get_or_load(self, query, params, loader, ttl=None):
+        key = cache_key(query, params)
+        tables = tables_in(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                self._remove(key)
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+                generations = {t: self._generations.get(t, 0) for t in tables}
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                # Skip storing a result that a concurrent write has already made stale
+                if flight.error is None and all(
+                        self._generations.get(t, 0) == g for t, g in generations.items()):
+                    self._store(key, flight.result, tables, self.ttl if ttl is None else ttl)
+            flight.done.set()
+        return flight.result
+
+    def invalidate_tables(self, tables):
+        tables = {t.lower() for t in tables}
+        if not tables:
+            return 0
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry[3] & tables]
+            for key in stale:
+                self._remove(key)
+            self._stats['invalidations'] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+    def __contains__(self, query):
+        with self._lock:
+            return any(key[0] == query for key in self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, value, tables, ttl):
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + ttl, tables)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+
+query_cache = QueryCache()
+
+_pending_writes = {}
+_pending_lock = threading.Lock()
+
+
+def track_writes(conn, cache=None):
+    """
+    Record the tables written on conn (via sqlite3's trace callback) so
+    they can be invalidated in `cache` once the writes are committed.
+    """
+    cache = cache or query_cache
+    written = set()
+    with _pending_lock:
+        _pending_writes[id(conn)] = (cache, written)
+
+    def trace(statement):
+        if WRITE_PATTERN.match(statement):
+            written.update(tables_in(statement))
+
+    conn.set_trace_callback(trace)
+
+
+def is_tracked(conn):
+    with _pending_lock:
+        return id(conn) in _pending_writes
+
+
+def invalidate_writes(conn):
+    """
+    Invalidate cached reads of every table written on conn so far.
+    """
+    with _pending_lock:
+        cache, written = _pending_writes.get(id(conn), (None, ()))
+        tables = set(written)
+        if written:
+            written.clear()
+    if cache is not None and tables:
+        cache.invalidate_tables(tables)
+
+
+def untrack_writes(conn):
+    invalidate_writes(conn)
+    with _pending_lock:
+        _pending_writes.pop(id(conn), None)
+    conn.set_trace_callback(None)
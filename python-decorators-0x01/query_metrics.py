@@ -0,0 +1,156 @@
+import atexit
+import functools
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import threading
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Reduce a query to its shape so that calls differing only in literal
+    values share one set of metrics. Memoized on the raw text, so the
+    regex passes only run the first time a query is seen.
+    """
+    return _normalize(str(query))
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize(query):
+    query = _STRING.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _IN_LIST.sub("IN (?)", query)
+    return _SPACE.sub(" ", query).strip()
+
+
+class LatencyHistogram:
+    """
+    Power-of-two nanosecond buckets: constant memory per query shape and
+    percentiles accurate to within a factor of two.
+    """
+    __slots__ = ('buckets', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns):
+        self.buckets[max(elapsed_ns, 1).bit_length() - 1] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(2 ** (i + 1), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else None,
+            'p50_ms': self.percentile(50) / 1e6 if self.count else None,
+            'p99_ms': self.percentile(99) / 1e6 if self.count else None,
+            'max_ms': self.max_ns / 1e6,
+        }
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def _attach_pipeline(logger, handlers):
+    """
+    Give logger one QueueHandler/QueueListener pair, shared by every
+    QueryMetrics that logs to it, so each record is written once.
+    """
+    with _pipelines_lock:
+        pipeline = _pipelines.get(logger.name)
+        if pipeline is None:
+            records = queue.SimpleQueue()
+            queue_handler = logging.handlers.QueueHandler(records)
+            listener = logging.handlers.QueueListener(
+                records, *(handlers or [logging.StreamHandler()]), respect_handler_level=True)
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(queue_handler)
+            listener.start()
+            pipeline = _pipelines[logger.name] = {'handler': queue_handler, 'listener': listener, 'users': 0}
+        elif handlers:
+            raise ValueError(f"Logger {logger.name!r} already has query metrics handlers; "
+                             "pass a different logger_name")
+        pipeline['users'] += 1
+
+
+def _detach_pipeline(logger):
+    with _pipelines_lock:
+        pipeline = _pipelines.get(logger.name)
+        if pipeline is None:
+            return
+        pipeline['users'] -= 1
+        if pipeline['users'] == 0:
+            del _pipelines[logger.name]
+            pipeline['listener'].stop()
+            logger.removeHandler(pipeline['handler'])
+
+
+class QueryMetrics:
+    """
+    Per-query-shape latency histograms plus sampled and slow-query logging.
+    Log records go through a QueueHandler, so the calling thread only
+    enqueues them; a QueueListener thread does the actual I/O. Instances
+    sharing a logger_name share that handler and listener; handlers can
+    only be given by the first of them.
+    """
+
+    def __init__(self, slow_threshold_ms=100.0, sample_rate=0.01, logger_name='queries',
+                 handlers=None):
+        self.slow_threshold_ns = int(slow_threshold_ms * 1e6)
+        self.sample_rate = sample_rate
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+        self.logger = logging.getLogger(logger_name)
+        _attach_pipeline(self.logger, handlers)
+        self._closed = False
+        atexit.register(self.close)
+
+    def record(self, query, elapsed_ns):
+        shape = normalize_query(query)
+        with self._lock:
+            histogram = self._histograms.get(shape)
+            if histogram is None:
+                histogram = self._histograms[shape] = LatencyHistogram()
+            histogram.record(elapsed_ns)
+            slow = elapsed_ns >= self.slow_threshold_ns
+            if slow:
+                self.slow_queries += 1
+        if slow:
+            self.logger.warning("Slow query (%.2f ms): %s", elapsed_ns / 1e6, query)
+        elif self.sample_rate and random.random() < self.sample_rate:
+            self.logger.info("Query (%.2f ms): %s", elapsed_ns / 1e6, query)
+
+    def report(self):
+        with self._lock:
+            return {shape: h.summary() for shape, h in self._histograms.items()}
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            _detach_pipeline(self.logger)
@@ -0,0 +1,121 @@
+import random
+import sqlite3
+import threading
+import time
+
+TRANSIENT_SQLITE_MESSAGES = ('database is locked', 'database table is locked', 'database is busy',
+                             'unable to open database file', 'disk i/o error')
+
+
+def is_retryable(error):
+    """
+    Default error classification: lock contention and connectivity problems
+    are worth retrying; everything else (syntax errors, constraint
+    violations, programming errors) is permanent.
+    """
+    if isinstance(error, sqlite3.OperationalError):
+        message = str(error).lower()
+        return any(m in message for m in TRANSIENT_SQLITE_MESSAGES)
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def classifier(retry_on):
+    """
+    Turn retry_on (None, an exception class, a tuple of them or a predicate)
+    into a predicate over exceptions.
+    """
+    if retry_on is None:
+        return is_retryable
+    if isinstance(retry_on, type) or isinstance(retry_on, tuple):
+        return lambda error: isinstance(error, retry_on)
+    return retry_on
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    # Full jitter: uniform over [0, min(max_delay, base_delay * 2 ** attempt)]
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every retrying call in the process. Each retry
+    spends a token and each success earns back `ratio` of one, so retries
+    stay a bounded fraction of traffic when the database is down.
+    """
+
+    def __init__(self, max_tokens=10.0, ratio=0.1):
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self.tokens = max_tokens
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails fast after failure_threshold consecutive retryable failures.
+    After reset_timeout seconds it lets a single probe call through
+    (half-open); success closes the circuit, failure re-opens it.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit open: database calls are failing fast")
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("Circuit half-open: probe already in flight")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def record_neutral(self):
+        # A permanent error or a cancelled call says nothing about database
+        # health; just end any probe
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+
+default_budget = RetryBudget()
@@ -0,0 +1,148 @@
+import queue
+import sqlite3
+import threading
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative means KiB: 64 MiB of page cache
+}
+
+
+class Connection(sqlite3.Connection):
+    """
+    sqlite3.Connection that remembers its statement cache size, which
+    sqlite3 itself does not expose.
+    """
+    cached_statements = 128  # sqlite3.connect's default
+
+
+def open_connection(db_name, pragmas=None, cached_statements=256, check_same_thread=True):
+    """
+    Open a SQLite connection and apply PRAGMAs once. cached_statements sets
+    the size of sqlite3's per-connection prepared statement cache.
+    """
+    conn = sqlite3.connect(db_name, cached_statements=cached_statements,
+                           check_same_thread=check_same_thread, factory=Connection)
+    conn.cached_statements = cached_statements
+    for name, value in (DEFAULT_PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ThreadLocalConnections:
+    """
+    One long-lived connection per thread, reused across calls. Nested
+    acquire() calls on the same thread get the same connection; an
+    uncommitted transaction is rolled back when the outermost caller
+    releases it, matching what close() used to do. A thread's connection
+    is closed when the thread exits and its thread-local is collected.
+    """
+
+    def __init__(self, db_name, pragmas=None, cached_statements=256):
+        self.db_name = db_name
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+
+    def acquire(self):
+        local = self._local
+        if getattr(local, 'conn', None) is None:
+            local.conn = open_connection(self.db_name, self.pragmas, self.cached_statements)
+            local.depth = 0
+        local.depth += 1
+        return local.conn
+
+    def release(self, conn):
+        local = self._local
+        local.depth -= 1
+        if local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+    def close(self):
+        # Only the owning thread may use a connection, so close what this thread holds
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of connections shared between threads. acquire() blocks
+    up to timeout seconds when all max_size connections are in use.
+    """
+
+    def __init__(self, db_name, max_size=5, pragmas=None, cached_statements=256, timeout=30.0):
+        self.db_name = db_name
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No SQLite connection available after {self.timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return open_connection(self.db_name, self.pragmas, self.cached_statements,
+                                       check_same_thread=False)
+            except Exception:
+                self._slots.release()
+                raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def shared_connections(db_name, **options):
+    """
+    The process-wide ThreadLocalConnections for db_name, so every helper
+    on a thread reuses one connection and its prepared statement cache.
+    options only apply on first use.
+    """
+    with _shared_lock:
+        provider = _shared.get(db_name)
+        if provider is None:
+            provider = _shared[db_name] = ThreadLocalConnections(db_name, **options)
+        return provider
+
+
+class ConnectPerCall:
+    """
+    The original behaviour: a fresh connection for every call.
+    """
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+
+    def acquire(self):
+        return sqlite3.connect(self.db_name)
+
+    def release(self, conn):
+        conn.close()
+
+    def close(self):
+        pass
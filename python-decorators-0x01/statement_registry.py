@@ -0,0 +1,58 @@
+import threading
+import warnings
+from collections import Counter
+
+SQLITE_DEFAULT_CACHE = 128
+
+
+class StatementRegistry:
+    """
+    Runs parameterized statements and counts executions per SQL text.
+    sqlite3 keeps compiled statements in a per-connection LRU cache keyed on
+    the SQL text (sized by connect(cached_statements=...)), so running the
+    same text with bound parameters on a reused connection skips parsing and
+    planning. execute() warns once when more distinct statements are in use
+    than the connection's cache can hold (sqlite_pool.open_connection
+    records that size). At most max_tracked texts are counted, so
+    interpolated SQL cannot grow the registry without bound; executions of
+    further texts only add to `untracked`.
+    """
+
+    def __init__(self, max_tracked=1024):
+        self.max_tracked = max_tracked
+        self.executions = Counter()
+        self.untracked = 0
+        self._warned = False
+        self._lock = threading.Lock()
+
+    def execute(self, conn, sql, params=(), _stacklevel=2):
+        cursor = conn.execute(sql, params)
+        cache_size = getattr(conn, 'cached_statements', SQLITE_DEFAULT_CACHE)
+        with self._lock:
+            if sql in self.executions or len(self.executions) < self.max_tracked:
+                self.executions[sql] += 1
+            else:
+                self.untracked += 1
+            warn = not self._warned and (self.untracked or len(self.executions) > cache_size)
+            if warn:
+                self._warned = True
+        if warn:
+            warnings.warn(
+                f"More than {cache_size} distinct statements are in use, so sqlite3's "
+                "statement cache is evicting them; bind values as parameters instead "
+                "of formatting them into the SQL, or raise cached_statements.",
+                RuntimeWarning, stacklevel=_stacklevel)
+        return cursor
+
+    def fetchall(self, conn, sql, params=()):
+        return self.execute(conn, sql, params, _stacklevel=3).fetchall()
+
+    def fetchone(self, conn, sql, params=()):
+        return self.execute(conn, sql, params, _stacklevel=3).fetchone()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.executions)
+
+
+statements = StatementRegistry()
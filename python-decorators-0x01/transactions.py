@@ -0,0 +1,142 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from query_cache import track_writes, invalidate_writes, untrack_writes
+
+_depths = {}
+
+
+@contextmanager
+def atomic(conn):
+    """
+    Run a block in a transaction on conn. The outermost block commits or
+    rolls back; nested blocks use SAVEPOINTs, so a failing inner block only
+    undoes its own work and nothing is committed early.
+    """
+    key = id(conn)
+    depth = _depths.get(key, 0)
+    _depths[key] = depth + 1
+    try:
+        if depth == 0:
+            # Begin explicitly: releasing a SAVEPOINT that opened the
+            # transaction would otherwise commit it
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            try:
+                yield conn
+                conn.commit()
+                invalidate_writes(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+        else:
+            name = f"sp_{depth}"
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+                raise
+            conn.execute(f"RELEASE {name}")
+    finally:
+        if depth == 0:
+            del _depths[key]
+        else:
+            _depths[key] = depth
+
+
+class GroupCommitter:
+    """
+    Coalesces writes from many callers into one commit. A writer thread
+    takes up to max_batch queued operations, or whatever arrives within
+    window seconds of the first, runs each under its own SAVEPOINT and
+    then commits once. Every caller gets its own result or exception;
+    if the commit itself fails, every caller in the batch gets that error.
+    """
+
+    def __init__(self, db_name, max_batch=100, window=0.005):
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.Queue()
+        self._stop = object()
+        self.batches = 0
+        self.operations = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        self._queue.put(self._stop)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is self._stop:
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_name)
+        track_writes(conn)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._stop:
+                    break
+                self._run_batch(conn, self._collect(item))
+        finally:
+            untrack_writes(conn)
+            conn.close()
+
+    def _run_batch(self, conn, batch):
+        # Never raises: every future in the batch is resolved, so callers
+        # cannot block forever and the writer thread keeps serving
+        outcomes = {}
+        with_error = None
+        try:
+            with atomic(conn):
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with atomic(conn):
+                            outcomes[future] = (func(conn, *args, **kwargs), None)
+                    except BaseException as e:
+                        outcomes[future] = (None, e)
+        except BaseException as e:
+            with_error = e
+        self.batches += 1
+        self.operations += len(batch)
+        for future, _, _, _ in batch:
+            if future in outcomes:
+                result, error = outcomes[future]
+            elif future.cancelled() or not future.set_running_or_notify_cancel():
+                continue
+            else:
+                # The batch failed before this operation ran
+                result, error = None, None
+            error = with_error or error
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -1,16 +1,44 @@
 import mysql.connector
-from seed import connect_to_prodev
+from seed import get_connection
+from compact_rows import UserRecord, convert_rows
+from stream_helpers import close_quietly
 
-def stream_users():
-    connection = connect_to_prodev()
+def stream_users(chunk_size=None, row_format='dict'):
+    """
+    Yield user_data rows one by one. With chunk_size set, rows are read from
+    an unbuffered cursor in fetchmany(chunk_size) chunks, so client memory
+    stays bounded by one chunk however large the table is.
+    row_format is 'dict', 'tuple' (see compact_rows.USER_COLUMNS) or 'record'.
+    The connection is closed even if the consumer stops early.
+    """
+    if row_format not in ('dict', 'tuple', 'record'):
+        raise ValueError(f"stream_users yields single rows; unsupported row format: {row_format}")
+    connection = get_connection()
     if not connection:
         return
+    cursor = None
+    as_dict = row_format == 'dict'
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
-        for row in cursor:
-            yield row
-        cursor.close()
-        connection.close()
+        if chunk_size is None:
+            cursor = connection.cursor(dictionary=as_dict)
+            cursor.execute("SELECT * FROM user_data")
+            if row_format == 'record':
+                for row in cursor:
+                    yield UserRecord(*row)
+            else:
+                for row in cursor:
+                    yield row
+        else:
+            cursor = connection.cursor(dictionary=as_dict, buffered=False)
+            cursor.execute("SELECT * FROM user_data")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if not as_dict:
+                    rows = convert_rows(rows, cursor.column_names, row_format)
+                yield from rows
     except mysql.connector.Error as err:
-        print(f"Error streaming users: {err}")
\ No newline at end of file
+        print(f"Error streaming users: {err}")
+    finally:
+        close_quietly(cursor, connection)
@@ -1,28 +1,75 @@
 import mysql.connector
-from seed import connect_to_prodev
+from seed import get_connection
+from query_filters import compile_select, where
+from parallel_scan import parallel_scan
+from compact_rows import USER_COLUMNS, convert_rows, last_value
+from statements import statements
 
-def stream_users_in_batches(batch_size):
-    connection = connect_to_prodev()
+def users_after_query(last_user_id=None, select_sql="*", where_sql="", params=()):
+    conditions = [where_sql] if where_sql else []
+    if last_user_id is not None:
+        conditions.append("user_id > %s")
+        params = params + (last_user_id,)
+    clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {select_sql} FROM user_data{clause} ORDER BY user_id LIMIT %s", params
+
+def batch_resume_token(batch, column_names=USER_COLUMNS):
+    # The last user_id of a keyset batch; pass it back as resume_token to continue
+    return last_value(batch, column_names, 'user_id') if len(batch) else None
+
+def stream_users_in_batches(batch_size, keyset=False, resume_token=None, predicates=(), columns=None,
+                            row_format='dict'):
+    """
+    Yield batches of user rows. predicates (query_filters.Predicate) and
+    columns are compiled into the WHERE clause and SELECT list, so rows
+    that would be discarded never leave MySQL.
+    row_format is 'dict', 'tuple', 'record' or 'columnar' (one
+    compact_rows.ColumnarBatch per batch).
+    """
+    keyset = keyset or resume_token is not None
+    if keyset and columns and 'user_id' not in columns:
+        columns = ['user_id', *columns]
+    select_sql, where_sql, params = compile_select(columns, predicates)
+    connection = get_connection()
     if not connection:
         return
     try:
-        cursor = connection.cursor(dictionary=True)
+        as_dict = row_format == 'dict'
+        column_names = columns or USER_COLUMNS
         offset = 0
+        last_user_id = resume_token
         while True:
-            cursor.execute(f"SELECT * FROM user_data LIMIT {batch_size} OFFSET {offset}")
-            batch = cursor.fetchall()
+            # Only values vary between batches, so each SQL text is prepared once per connection
+            if keyset:
+                query, query_params = users_after_query(last_user_id, select_sql, where_sql, params)
+                batch = statements.fetchall(connection, query, query_params + (batch_size,), as_dict)
+            else:
+                clause = f" WHERE {where_sql}" if where_sql else ""
+                query = f"SELECT {select_sql} FROM user_data{clause} LIMIT %s OFFSET %s"
+                batch = statements.fetchall(connection, query, params + (batch_size, offset), as_dict)
             if not batch:
                 break
+            if not as_dict:
+                batch = convert_rows(batch, column_names, row_format)
             yield batch
             offset += batch_size
-        cursor.close()
-        connection.close()
+            if keyset:
+                last_user_id = last_value(batch, column_names, 'user_id')
     except mysql.connector.Error as err:
         print(f"Error streaming batches: {err}")
+    finally:
+        # Returns the connection to the pool even if the consumer stops early
+        connection.close()
 
-def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+def batch_processing(batch_size, partitions=None):
+    # The age filter runs in MySQL; only matching users are fetched.
+    # With partitions set, user_id ranges are scanned concurrently.
+    predicates = [where('age', '>', 25)]
+    if partitions:
+        batches = parallel_scan(partitions, batch_size, predicates=predicates)
+    else:
+        batches = stream_users_in_batches(batch_size, predicates=predicates)
+    for batch in batches:
         for user in batch:
-            if user['age'] > 25:
-                print(user)
-                yield user
\ No newline at end of file
+            print(user)
+            yield user
@@ -3,4 +3,8 @@ from itertools import islice
 stream_users = __import__('0-stream_users').stream_users
 
 for user in islice(stream_users(), 6):
-    print(user)
\ No newline at end of file
+    print(user)
+
+# Streaming mode: unbuffered cursor read in chunks of 500 rows
+for user in islice(stream_users(chunk_size=500), 6):
+    print(user)
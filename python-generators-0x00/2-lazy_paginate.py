@@ -1,18 +1,77 @@
-from seed import connect_to_prodev
+import queue
+import threading
+from seed import get_connection
+from compact_rows import USER_COLUMNS, convert_rows, last_value
+from statements import statements
+from stream_helpers import DONE, FetchError, pump
 
-def paginate_users(page_size, offset):
-    connection = connect_to_prodev()
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
-    rows = cursor.fetchall()
-    connection.close()
+def paginate_users(page_size, offset, row_format='dict'):
+    connection = get_connection()
+    try:
+        rows = statements.fetchall(
+            connection, "SELECT * FROM user_data LIMIT %s OFFSET %s", (page_size, offset),
+            dictionary=row_format == 'dict'
+        )
+        if row_format != 'dict':
+            rows = convert_rows(rows, USER_COLUMNS, row_format)
+    finally:
+        connection.close()
     return rows
 
-def lazy_paginate(page_size):
+def paginate_users_after(page_size, last_user_id=None, row_format='dict'):
+    connection = get_connection()
+    try:
+        if last_user_id is None:
+            query, params = "SELECT * FROM user_data ORDER BY user_id LIMIT %s", (page_size,)
+        else:
+            query = "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+            params = (last_user_id, page_size)
+        rows = statements.fetchall(connection, query, params, dictionary=row_format == 'dict')
+        if row_format != 'dict':
+            rows = convert_rows(rows, USER_COLUMNS, row_format)
+    finally:
+        connection.close()
+    return rows
+
+def prefetch_pages(pages, depth):
+    """
+    Iterate `pages` on a background thread, keeping up to `depth` pages
+    ready in a bounded queue while the caller processes the current one.
+    Errors raised while fetching are re-raised in the caller; closing the
+    generator stops the fetch thread.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    thread = threading.Thread(target=pump, args=(pages, ready, stop), daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is DONE:
+                break
+            if isinstance(item, FetchError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+def lazy_paginate(page_size, keyset=False, resume_token=None, row_format='dict', prefetch=0):
+    if prefetch:
+        # Fetch the next `prefetch` pages in the background while this one is processed
+        yield from prefetch_pages(lazy_paginate(page_size, keyset, resume_token, row_format), prefetch)
+        return
     offset = 0
+    last_user_id = resume_token
+    keyset = keyset or resume_token is not None
     while True:
-        page = paginate_users(page_size, offset)
+        if keyset:
+            page = paginate_users_after(page_size, last_user_id, row_format)
+        else:
+            page = paginate_users(page_size, offset, row_format)
         if not page:
             break
         yield page
-        offset += page_size
\ No newline at end of file
+        offset += page_size
+        if keyset:
+            last_user_id = last_value(page, USER_COLUMNS, 'user_id')
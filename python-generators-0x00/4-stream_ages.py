@@ -1,8 +1,9 @@
 import mysql.connector
-from seed import connect_to_prodev
+from seed import get_connection
+from stream_stats import sql_aggregate, column_stats
 
 def stream_user_ages():
-    connection = connect_to_prodev()
+    connection = get_connection()
     if not connection:
         return
     try:
@@ -11,11 +12,17 @@ def stream_user_ages():
         for (age,) in cursor:
             yield float(age)
         cursor.close()
-        connection.close()
     except mysql.connector.Error as err:
         print(f"Error streaming ages: {err}")
+    finally:
+        connection.close()
 
-def calculate_average_age():
+def calculate_average_age(push_down=False):
+    if push_down:
+        result = sql_aggregate('age', ('avg',))
+        average = result['avg'] if result and result['avg'] is not None else 0
+        print(f"Average age of users: {average:.2f}")
+        return
     total = 0
     count = 0
     for age in stream_user_ages():
@@ -24,5 +31,15 @@ def calculate_average_age():
     average = total / count if count > 0 else 0
     print(f"Average age of users: {average:.2f}")
 
+def print_age_stats(chunk_size=10000):
+    stats = column_stats('age', chunk_size=chunk_size, bins=range(0, 121, 10))
+    if not stats['count']:
+        print("No users found")
+        return
+    print(f"Users: {stats['count']}, mean age {stats['mean']:.2f}, "
+          f"stddev {stats['stddev']:.2f}, min {stats['min']:.2f}, max {stats['max']:.2f}")
+    for p, value in stats['percentiles'].items():
+        print(f"p{p} age: {value:.2f}")
+
 if __name__ == "__main__":
     calculate_average_age()
\ No newline at end of file
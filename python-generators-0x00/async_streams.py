@@ -0,0 +1,194 @@
+import asyncio
+from contextlib import aclosing, asynccontextmanager
+
+try:
+    import aiomysql
+except ImportError:  # Only needed for the MySQL backend
+    aiomysql = None
+
+try:
+    import aiosqlite
+except ImportError:  # Only needed for the SQLite backend
+    aiosqlite = None
+
+
+def _drop_connection(connection):
+    # Closing an unbuffered cursor mid-result reads the rest of it, so on an
+    # early exit (break, aclose, cancellation or an error) close the socket
+    # instead, as close_quietly does for the sync generators. The pool
+    # discards a closed connection on release.
+    try:
+        connection.close()
+    except (aiomysql.Error, OSError):
+        pass
+
+
+class MySQLBackend:
+    """
+    aiomysql-backed source for ALX_prodev. Connections come from an aiomysql
+    pool and results are read with a server-side (unbuffered) dict cursor.
+    """
+    placeholder = "%s"
+
+    def __init__(self, host="localhost", user="root", password="galk7117!", db="ALX_prodev",
+                 minsize=1, maxsize=10):
+        if aiomysql is None:
+            raise ImportError("MySQLBackend requires aiomysql (pip install aiomysql)")
+        self._options = dict(host=host, user=user, password=password, db=db,
+                             minsize=minsize, maxsize=maxsize)
+        self._pool = None
+        self._lock = asyncio.Lock()
+
+    async def _get_pool(self):
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await aiomysql.create_pool(**self._options)
+            return self._pool
+
+    async def chunks(self, sql, params, chunk_size):
+        pool = await self._get_pool()
+        connection = await pool.acquire()
+        finished = False
+        try:
+            cursor = await connection.cursor(aiomysql.SSDictCursor)
+            await cursor.execute(sql, params)
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+            await cursor.close()
+            finished = True
+        finally:
+            if not finished:
+                _drop_connection(connection)
+            pool.release(connection)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+
+class SQLiteBackend:
+    """
+    aiosqlite-backed source with the same interface, for tests and offline
+    runs against a SQLite copy of user_data. Keeps up to `size` open
+    connections in an asyncio.Queue.
+    """
+    placeholder = "?"
+
+    def __init__(self, path, size=5):
+        if aiosqlite is None:
+            raise ImportError("SQLiteBackend requires aiosqlite (pip install aiosqlite)")
+        self.path = path
+        self.size = size
+        self._idle = asyncio.Queue()
+        self._opened = 0
+        self._lock = asyncio.Lock()
+        self._all = []
+
+    @asynccontextmanager
+    async def _connection(self):
+        async with self._lock:
+            if self._idle.empty() and self._opened < self.size:
+                self._opened += 1
+                connection = await aiosqlite.connect(self.path)
+                connection.row_factory = aiosqlite.Row
+                self._all.append(connection)
+                self._idle.put_nowait(connection)
+        connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def chunks(self, sql, params, chunk_size):
+        async with self._connection() as connection:
+            async with connection.execute(sql, params) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+
+    async def close(self):
+        for connection in self._all:
+            await connection.close()
+        self._all.clear()
+        self._opened = 0
+        self._idle = asyncio.Queue()
+
+
+def _sql(backend, query):
+    return query.replace("%s", backend.placeholder)
+
+
+async def _fetch_page(backend, query, params, page_size):
+    # aclosing() hands the connection back as soon as the page is read
+    async with aclosing(backend.chunks(_sql(backend, query), params, page_size)) as chunks:
+        async for rows in chunks:
+            return rows
+    return []
+
+
+async def stream_users(backend, chunk_size=1000):
+    async with aclosing(backend.chunks(_sql(backend, "SELECT * FROM user_data"), (), chunk_size)) as chunks:
+        async for rows in chunks:
+            for row in rows:
+                yield row
+
+
+async def paginate_users(backend, page_size, offset):
+    return await _fetch_page(backend, "SELECT * FROM user_data LIMIT %s OFFSET %s", (page_size, offset), page_size)
+
+
+async def paginate_users_after(backend, page_size, last_user_id=None):
+    if last_user_id is None:
+        query, params = "SELECT * FROM user_data ORDER BY user_id LIMIT %s", (page_size,)
+    else:
+        query = "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+        params = (last_user_id, page_size)
+    return await _fetch_page(backend, query, params, page_size)
+
+
+async def lazy_paginate(backend, page_size, keyset=False, resume_token=None):
+    offset = 0
+    last_user_id = resume_token
+    keyset = keyset or resume_token is not None
+    while True:
+        if keyset:
+            page = await paginate_users_after(backend, page_size, last_user_id)
+        else:
+            page = await paginate_users(backend, page_size, offset)
+        if not page:
+            break
+        yield page
+        offset += page_size
+        if keyset:
+            last_user_id = page[-1]['user_id']
+
+
+async def stream_users_in_batches(backend, batch_size, keyset=True, resume_token=None):
+    # One connection per page keeps the pool free between batches
+    async for page in lazy_paginate(backend, batch_size, keyset, resume_token):
+        yield page
+
+
+async def stream_user_ages(backend, chunk_size=1000):
+    async with aclosing(backend.chunks(_sql(backend, "SELECT age FROM user_data"), (), chunk_size)) as chunks:
+        async for rows in chunks:
+            for row in rows:
+                yield float(row['age'])
+
+
+async def calculate_average_age(backend):
+    total = 0
+    count = 0
+    async for age in stream_user_ages(backend):
+        total += age
+        count += 1
+    average = total / count if count > 0 else 0
+    print(f"Average age of users: {average:.2f}")
+    return average
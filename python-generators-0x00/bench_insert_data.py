@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+import csv
+import random
+import sys
+import time
+seed = __import__('seed')
+
+
+def generate_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'email', 'age'])
+        for i in range(rows):
+            writer.writerow([f"User {i}", f"user{i}@example.com", random.randint(18, 90)])
+
+
+def reset_table(connection):
+    cursor = connection.cursor()
+    cursor.execute("TRUNCATE TABLE user_data")
+    cursor.close()
+
+
+def run(label, connection, load):
+    reset_table(connection)
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {ROWS / elapsed:10.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = 'bench_user_data.csv'
+    generate_csv(path, ROWS)
+
+    connection = seed.connect_to_prodev(allow_local_infile=True)
+    if connection:
+        seed.create_table(connection)
+        run("insert_data (row by row)", connection,
+            lambda: seed.insert_data(connection, path))
+        run("insert_data_bulk executemany", connection,
+            lambda: seed.insert_data_bulk(connection, path))
+        run("insert_data_bulk LOAD DATA", connection,
+            lambda: seed.insert_data_bulk(connection, path, batch_size=50000, use_load_data=True))
+        reset_table(connection)
+        connection.close()
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+import sys
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+from compact_rows import USER_COLUMNS, convert_rows
+
+
+def generate_rows(count):
+    return [
+        (str(uuid.uuid4()), f"User {i}", f"user{i}@example.com", Decimal(18 + i % 70))
+        for i in range(count)
+    ]
+
+
+def measure(row_format, rows, batch_size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    batches = []
+    total_age = 0.0
+    for i in range(0, len(rows), batch_size):
+        batch = convert_rows(rows[i:i + batch_size], USER_COLUMNS, row_format)
+        if row_format == 'columnar':
+            total_age += sum(batch.column('age'))
+        elif row_format == 'tuple':
+            total_age += sum(float(row[3]) for row in batch)
+        else:
+            total_age += sum(float(row['age']) for row in batch)
+        batches.append(batch)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    batch_size = 1000
+    rows = generate_rows(count)
+    print(f"{count} rows, batches of {batch_size}")
+    print(f"{'format':<10} {'seconds':>8} {'rows/sec':>12} {'retained MiB':>13}")
+    for row_format in ('dict', 'tuple', 'record', 'columnar'):
+        elapsed, retained = measure(row_format, rows, batch_size)
+        print(f"{row_format:<10} {elapsed:8.3f} {count / elapsed:12.0f} {retained / 2**20:13.1f}")
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+import sys
+import time
+seed = __import__('seed')
+from statements import StatementRegistry
+
+QUERY = "SELECT * FROM user_data WHERE user_id = %s"
+
+
+def run(label, lookup, user_ids):
+    start = time.perf_counter()
+    for user_id in user_ids:
+        lookup(user_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed / len(user_ids) * 1e6:8.1f} us/lookup")
+
+
+if __name__ == "__main__":
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    connection = seed.get_connection()
+    if connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT user_id FROM user_data LIMIT %s", (1000,))
+        user_ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        user_ids = (user_ids * (lookups // max(len(user_ids), 1) + 1))[:lookups]
+
+        def text_protocol(user_id):
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(QUERY, (user_id,))
+            cursor.fetchall()
+            cursor.close()
+
+        registry = StatementRegistry()
+        run("new cursor + SQL text per call", text_protocol, user_ids)
+        run("prepared statement registry", lambda user_id: registry.fetchall(connection, QUERY, (user_id,)), user_ids)
+        print(registry.stats())
+        connection.close()
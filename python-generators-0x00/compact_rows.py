@@ -0,0 +1,105 @@
+from array import array
+
+ROW_FORMATS = ('dict', 'tuple', 'record', 'columnar')
+USER_COLUMNS = ('user_id', 'name', 'email', 'age')
+NUMERIC_COLUMNS = ('age',)
+
+
+class UserRecord:
+    """
+    Slotted user row: no per-row __dict__ and no repeated key strings.
+    Supports record['age'] as well as record.age, so code written against
+    dict rows keeps working.
+    """
+    __slots__ = USER_COLUMNS
+
+    def __init__(self, user_id=None, name=None, email=None, age=None):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (getattr(self, f) for f in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, UserRecord) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)
+        return f"UserRecord({fields})"
+
+
+class ColumnarBatch:
+    """
+    A batch of rows stored column by column: numeric columns in array('d'),
+    the rest in lists. One object per batch instead of one dict per row.
+    """
+    __slots__ = ('column_names', 'columns', '_index')
+
+    def __init__(self, column_names, rows):
+        self.column_names = tuple(column_names)
+        self._index = {name: i for i, name in enumerate(self.column_names)}
+        transposed = list(zip(*rows)) if rows else [()] * len(self.column_names)
+        self.columns = [
+            array('d', map(float, values)) if name in NUMERIC_COLUMNS else list(values)
+            for name, values in zip(self.column_names, transposed)
+        ]
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def column(self, name):
+        return self.columns[self._index[name]]
+
+    def row(self, i):
+        return tuple(column[i] for column in self.columns)
+
+    def __iter__(self):
+        return zip(*self.columns)
+
+    def __repr__(self):
+        return f"ColumnarBatch({len(self)} rows, columns={self.column_names})"
+
+
+def column_index(column_names):
+    """
+    Shared name -> position map for tuple rows.
+    """
+    return {name: i for i, name in enumerate(column_names)}
+
+
+def convert_rows(rows, column_names, row_format):
+    """
+    Convert tuple rows from a non-dictionary cursor into the requested format.
+    'columnar' returns a single ColumnarBatch; the others return a list.
+    """
+    if row_format == 'tuple':
+        return rows
+    if row_format == 'record':
+        if tuple(column_names) == UserRecord.__slots__:
+            return [UserRecord(*row) for row in rows]
+        return [UserRecord(**dict(zip(column_names, row))) for row in rows]
+    if row_format == 'columnar':
+        return ColumnarBatch(column_names, rows)
+    if row_format == 'dict':
+        return [dict(zip(column_names, row)) for row in rows]
+    raise ValueError(f"Unknown row format: {row_format}")
+
+
+def last_value(batch, column_names, name):
+    """
+    The value of `name` in the last row of a batch in any row format.
+    """
+    if isinstance(batch, ColumnarBatch):
+        return batch.column(name)[-1]
+    row = batch[-1]
+    if isinstance(row, tuple):
+        return row[column_index(column_names)[name]]
+    return row[name]
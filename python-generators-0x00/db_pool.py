@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+import mysql.connector
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+_WAITED = object()
+
+
+class PooledConnection:
+    """
+    Proxy handed out by ConnectionPool. It behaves like the underlying
+    mysql.connector connection, except that close() returns it to the pool.
+    """
+
+    def __init__(self, pool, connection, created_at):
+        self._pool = pool
+        self._connection = connection
+        self._created_at = created_at
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._pool.release(self._connection, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of MySQL connections.
+
+    - At most max_size connections exist at once; acquire() waits up to
+      timeout seconds for one to be returned, then raises PoolExhausted.
+    - Idle connections older than idle_timeout seconds, or connections that
+      have lived longer than max_lifetime seconds, are closed instead of reused.
+    - A connection idle for more than health_check_after seconds is pinged
+      before it is handed out.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=30.0, idle_timeout=300.0,
+                 max_lifetime=3600.0, health_check_after=5.0):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self._idle = deque()  # (connection, created_at, returned_at)
+        self._size = 0
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._closed = False
+        self._stats = {'created': 0, 'discarded': 0, 'acquired': 0, 'waits': 0, 'wait_time': 0.0}
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        start = time.perf_counter()
+        while True:
+            with self._lock:
+                candidate = self._next_idle(deadline, timeout, waited, start)
+            if candidate is None:
+                break
+            if candidate is _WAITED:
+                waited = True
+                continue
+            # Ping or close outside the lock so a slow server only stalls this thread
+            connection, created_at, returned_at = candidate
+            if self._usable(connection, created_at, returned_at):
+                with self._lock:
+                    return self._hand_out(connection, created_at, waited, start)
+            self._discard(connection)
+        # Open the new connection outside the lock so other threads are not blocked on it
+        try:
+            connection = self._connect()
+        except Exception:
+            connection = None
+        if connection is None:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise mysql.connector.Error("Could not open a pooled connection")
+        with self._lock:
+            self._stats['created'] += 1
+            return self._hand_out(connection, time.monotonic(), waited, start)
+
+    def _next_idle(self, deadline, timeout, waited, start):
+        """
+        Called with the lock held. Returns an idle (connection, created_at,
+        returned_at) to check, None after reserving a slot for a new
+        connection, or _WAITED after waiting for a release.
+        """
+        if self._closed:
+            raise PoolExhausted("Connection pool is closed")
+        if self._idle:
+            return self._idle.pop()
+        if self._size < self.max_size:
+            self._size += 1
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._record_wait(waited, start)
+            raise PoolExhausted(f"No connection available after {timeout}s")
+        self._lock.wait(remaining)
+        return _WAITED
+
+    def release(self, connection, created_at):
+        now = time.monotonic()
+        reusable = not self._closed and now - created_at < self.max_lifetime
+        if reusable:
+            try:
+                # A generator abandoned mid-result leaves the connection unusable
+                if getattr(connection, 'unread_result', False):
+                    reusable = False
+                elif getattr(connection, 'in_transaction', False):
+                    connection.rollback()
+            except mysql.connector.Error:
+                reusable = False
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((connection, created_at, now))
+                self._lock.notify()
+        if not reusable:
+            self._discard(connection)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle = [entry[0] for entry in self._idle]
+            self._idle.clear()
+            self._lock.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=self._size, in_use=self._in_use,
+                        idle=len(self._idle), max_size=self.max_size)
+
+    def _usable(self, connection, created_at, returned_at):
+        now = time.monotonic()
+        if now - created_at >= self.max_lifetime or now - returned_at >= self.idle_timeout:
+            return False
+        if now - returned_at < self.health_check_after:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def _hand_out(self, connection, created_at, waited, start):
+        self._in_use += 1
+        self._stats['acquired'] += 1
+        self._record_wait(waited, start)
+        return PooledConnection(self, connection, created_at)
+
+    def _record_wait(self, waited, start):
+        if waited:
+            self._stats['waits'] += 1
+            self._stats['wait_time'] += time.perf_counter() - start
+
+    def _discard(self, connection):
+        # Called without the lock: closing may wait on the network
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._lock.notify()
@@ -0,0 +1,114 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import mysql.connector
+from seed import get_connection
+from query_filters import compile_select
+from stream_helpers import DONE, FetchError, close_quietly, pump
+
+KEY_SPACE = 16 ** 4
+
+
+def key_ranges(partitions):
+    """
+    Split the user_id space into contiguous (low, high) ranges. user_id is a
+    random UUID4 string, so equal-width ranges over its first four hex digits
+    hold roughly equal numbers of rows. None means unbounded.
+    """
+    bounds = [None]
+    for i in range(1, partitions):
+        bounds.append(format(i * KEY_SPACE // partitions, '04x'))
+    bounds.append(None)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def scan_range(low, high, batch_size, predicates=(), columns=None):
+    """
+    Yield batches of rows with low <= user_id < high, in user_id order,
+    from an unbuffered cursor on a connection of its own.
+    """
+    select_sql, where_sql, params = compile_select(columns, predicates)
+    conditions = [where_sql] if where_sql else []
+    if low is not None:
+        conditions.append("user_id >= %s")
+        params += (low,)
+    if high is not None:
+        conditions.append("user_id < %s")
+        params += (high,)
+    clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    connection = get_connection()
+    if not connection:
+        raise mysql.connector.Error(f"No connection for partition {low}..{high}")
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(f"SELECT {select_sql} FROM user_data{clause} ORDER BY user_id", params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+    finally:
+        close_quietly(cursor, connection)
+
+
+def parallel_scan(partitions=4, batch_size=1000, ordered=False, predicates=(), columns=None,
+                  queue_size=8):
+    """
+    Scan user_data as `partitions` user_id ranges read concurrently on a
+    thread pool, each with its own connection, and yield the batches as a
+    single generator. With ordered=True batches come back in user_id order;
+    otherwise in whatever order the partitions produce them.
+    Closing the generator early stops the workers.
+    """
+    stop = threading.Event()
+    errors = []
+    if ordered:
+        queues = [queue.Queue(maxsize=queue_size) for _ in range(partitions)]
+    else:
+        queues = [queue.Queue(maxsize=queue_size)] * partitions
+
+    def worker(index, low, high):
+        pump(scan_range(low, high, batch_size, predicates, columns), queues[index], stop)
+
+    executor = ThreadPoolExecutor(max_workers=partitions)
+    try:
+        for index, (low, high) in enumerate(key_ranges(partitions)):
+            executor.submit(worker, index, low, high)
+        if ordered:
+            for q in queues:
+                while True:
+                    batch = q.get()
+                    if batch is DONE:
+                        break
+                    if isinstance(batch, FetchError):
+                        errors.append(batch.error)
+                        continue
+                    yield batch
+                if errors:
+                    break
+        else:
+            remaining = partitions
+            while remaining:
+                batch = queues[0].get()
+                if batch is DONE:
+                    remaining -= 1
+                    if errors:
+                        break
+                    continue
+                if isinstance(batch, FetchError):
+                    errors.append(batch.error)
+                    continue
+                yield batch
+        if errors:
+            if not isinstance(errors[0], mysql.connector.Error):
+                raise errors[0]
+            print(f"Error in parallel scan: {errors[0]}")
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def parallel_stream_users(partitions=4, batch_size=1000, ordered=False, predicates=(), columns=None):
+    for batch in parallel_scan(partitions, batch_size, ordered, predicates, columns):
+        yield from batch
@@ -0,0 +1,81 @@
+import operator
+
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+class Predicate:
+    """
+    A single column comparison such as Predicate('age', '>', 25).
+    It compiles to a parameterized SQL condition for MySQL sources and
+    can also be evaluated against row dicts in-process.
+    """
+
+    def __init__(self, column, op, value):
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        if op not in OPERATORS and op != 'in':
+            raise ValueError(f"Unsupported operator: {op}")
+        self.column = column
+        self.op = op
+        self.value = tuple(value) if op == 'in' else value
+
+    def to_sql(self):
+        if self.op == 'in':
+            if not self.value:
+                return "1 = 0", ()
+            placeholders = ", ".join(["%s"] * len(self.value))
+            return f"{self.column} IN ({placeholders})", self.value
+        return f"{self.column} {self.op} %s", (self.value,)
+
+    def matches(self, row):
+        if self.op == 'in':
+            return row[self.column] in self.value
+        return OPERATORS[self.op](row[self.column], self.value)
+
+    def __repr__(self):
+        return f"Predicate({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+def where(column, op, value):
+    return Predicate(column, op, value)
+
+
+def compile_select(columns=None, predicates=()):
+    """
+    Build the SELECT column list and WHERE clause for user_data.
+    Returns (select_sql, where_sql, params); where_sql is "" with no predicates.
+    """
+    if columns:
+        unknown = [c for c in columns if c not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        select_sql = ", ".join(columns)
+    else:
+        select_sql = "*"
+    conditions = []
+    params = []
+    for predicate in predicates:
+        sql, values = predicate.to_sql()
+        conditions.append(sql)
+        params.extend(values)
+    where_sql = " AND ".join(conditions)
+    return select_sql, where_sql, tuple(params)
+
+
+def filter_rows(rows, predicates=(), columns=None):
+    """
+    In-process fallback for sources that cannot run SQL: apply the same
+    predicates and projection to an iterable of row dicts.
+    """
+    for row in rows:
+        if all(p.matches(row) for p in predicates):
+            yield {c: row[c] for c in columns} if columns else row
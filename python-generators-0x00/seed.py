@@ -1,6 +1,12 @@
 import mysql.connector
 import csv
+import os
+import queue
+import tempfile
+import threading
+import time
 import uuid
+from db_pool import ConnectionPool
 
 def connect_db():
     try:
@@ -22,19 +28,49 @@ def create_database(connection):
     except mysql.connector.Error as err:
         print(f"Error creating database: {err}")
 
-def connect_to_prodev():
+def connect_to_prodev(**options):
     try:
         connection = mysql.connector.connect(
             host="localhost",
             user="root",
             password="galk7117!",  
-            database="ALX_prodev"
+            database="ALX_prodev",
+            **options
         )
         return connection
     except mysql.connector.Error as err:
         print(f"Error connecting to ALX_prodev: {err}")
         return None
 
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(**options):
+    """
+    Return the shared ALX_prodev connection pool, creating it on first use.
+    options (max_size, timeout, idle_timeout, max_lifetime, ...) only apply
+    when the pool is created.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(connect_to_prodev, **options)
+        return _pool
+
+def get_connection():
+    """
+    Borrow a connection from the pool; closing it returns it to the pool.
+    Returns None if no connection could be obtained.
+    """
+    try:
+        return get_pool().acquire()
+    except Exception as err:
+        print(f"Error getting pooled connection: {err}")
+        return None
+
+def pool_stats():
+    return get_pool().stats()
+
 def create_table(connection):
     try:
         cursor = connection.cursor()
@@ -76,4 +112,120 @@ def insert_data(connection, csv_file):
     except mysql.connector.Error as err:
         print(f"Error inserting data: {err}")
     except Exception as e:
-        print(f"Error reading CSV: {e}")
\ No newline at end of file
+        print(f"Error reading CSV: {e}")
+
+def parse_user_rows(csv_file, batch_size, rejected):
+    batch = []
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        csv_reader = csv.reader(file)
+        next(csv_reader, None)  # Skip header (name,email,age)
+        for row_num, row in enumerate(csv_reader, start=2):
+            if len(row) != 3:
+                rejected.append(row_num)
+                continue
+            batch.append((str(uuid.uuid4()), row[0], row[1], row[2]))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def write_load_data_file(batch, file):
+    for user_id, name, email, age in batch:
+        fields = (user_id, name, email, age)
+        file.write("\t".join(
+            f.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n") for f in fields
+        ) + "\n")
+
+def load_data_infile(cursor, batch):
+    # Requires the connection to be opened with allow_local_infile=True
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', delete=False) as file:
+        write_load_data_file(batch, file)
+    try:
+        cursor.execute(
+            "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE user_data "
+            "FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+            "(user_id, name, email, age)",
+            (file.name,)
+        )
+    finally:
+        os.remove(file.name)
+
+def insert_data_bulk(connection, csv_file, batch_size=1000, commit_every=10000,
+                     use_load_data=False, queue_size=4):
+    """
+    Bulk-load csv_file into user_data. CSV parsing and UUID generation run on
+    a background thread; the calling thread only writes batches with
+    executemany (or LOAD DATA LOCAL INFILE) and commits every commit_every rows.
+    Returns a dict with sent, inserted (rows the server actually added),
+    skipped (duplicates ignored), rejected, failed, seconds and rows_per_sec.
+    """
+    batches = queue.Queue(maxsize=queue_size)
+    rejected = []
+    parse_errors = []
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for batch in parse_user_rows(csv_file, batch_size, rejected):
+                if stop.is_set():
+                    return
+                batches.put(batch)
+        except Exception as e:
+            parse_errors.append(e)
+        finally:
+            batches.put(done)
+
+    stats = {'sent': 0, 'inserted': 0, 'skipped': 0, 'rejected': 0, 'failed': 0}
+    start = time.perf_counter()
+    parser = threading.Thread(target=produce, daemon=True)
+    parser.start()
+    cursor = connection.cursor()
+    uncommitted = 0
+    try:
+        while True:
+            batch = batches.get()
+            if batch is done:
+                break
+            try:
+                if use_load_data:
+                    load_data_infile(cursor, batch)
+                else:
+                    cursor.executemany("""
+                        INSERT IGNORE INTO user_data (user_id, name, email, age)
+                        VALUES (%s, %s, %s, %s)
+                    """, batch)
+                # INSERT IGNORE skips duplicates, so count what the server added
+                added = cursor.rowcount if cursor.rowcount >= 0 else len(batch)
+                stats['sent'] += len(batch)
+                stats['inserted'] += added
+                stats['skipped'] += len(batch) - added
+                uncommitted += len(batch)
+            except mysql.connector.Error as err:
+                print(f"Error inserting batch of {len(batch)} rows: {err}")
+                stats['failed'] += len(batch)
+            if uncommitted >= commit_every:
+                connection.commit()
+                uncommitted = 0
+        connection.commit()
+    except mysql.connector.Error as err:
+        print(f"Error inserting data: {err}")
+    finally:
+        # Stop the parser early if the load was aborted, then drain the
+        # queue so it is never left blocked on put()
+        stop.set()
+        while parser.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        cursor.close()
+    if parse_errors:
+        print(f"Error reading CSV: {parse_errors[0]}")
+    stats['rejected'] = len(rejected)
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['sent'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"Inserted {stats['inserted']} of {stats['sent']} rows ({stats['rows_per_sec']:.0f} rows/sec), "
+          f"skipped {stats['skipped']} duplicates, rejected {stats['rejected']}, failed {stats['failed']}")
+    return stats
@@ -0,0 +1,60 @@
+import threading
+import weakref
+from collections import Counter
+import mysql.connector
+
+
+class StatementRegistry:
+    """
+    Reuses server-side prepared statements per connection. The first
+    execution of a SQL text on a connection prepares it (cursor with
+    prepared=True); later executions on the same pooled connection only
+    send the parameters. Execution and prepare counts are kept per SQL text.
+    """
+
+    def __init__(self):
+        self._cursors = weakref.WeakKeyDictionary()  # raw connection -> {(sql, dictionary): cursor}
+        self._lock = threading.Lock()
+        self.executions = Counter()
+        self.prepares = Counter()
+
+    def cursor(self, connection, sql, dictionary=True):
+        # Pooled proxies wrap the real connection; cache on the real one
+        raw = getattr(connection, '_connection', connection)
+        with self._lock:
+            cursors = self._cursors.setdefault(raw, {})
+            cursor = cursors.get((sql, dictionary))
+        if cursor is None:
+            cursor = raw.cursor(prepared=True, dictionary=dictionary)
+            with self._lock:
+                cursors[(sql, dictionary)] = cursor
+                self.prepares[sql] += 1
+        return cursor
+
+    def execute(self, connection, sql, params=(), dictionary=True):
+        """
+        Execute sql with params on a prepared cursor and return the cursor.
+        Read every row before executing another statement on the connection.
+        """
+        cursor = self.cursor(connection, sql, dictionary)
+        try:
+            cursor.execute(sql, params)
+        except mysql.connector.Error:
+            # Drop the cursor so a broken statement is re-prepared next time
+            with self._lock:
+                self._cursors.get(getattr(connection, '_connection', connection), {}).pop((sql, dictionary), None)
+            raise
+        with self._lock:
+            self.executions[sql] += 1
+        return cursor
+
+    def fetchall(self, connection, sql, params=(), dictionary=True):
+        return self.execute(connection, sql, params, dictionary).fetchall()
+
+    def stats(self):
+        with self._lock:
+            return {sql: {'executions': self.executions[sql], 'prepares': self.prepares[sql]}
+                    for sql in self.executions}
+
+
+statements = StatementRegistry()
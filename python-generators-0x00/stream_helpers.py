@@ -0,0 +1,63 @@
+import queue
+import mysql.connector
+
+DONE = object()
+
+
+class FetchError:
+    """
+    An exception raised on a producer thread, queued so the consumer can
+    re-raise it.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+
+def close_quietly(cursor, connection):
+    # An unbuffered cursor abandoned mid-result raises "Unread result found"
+    # on close; the connection is being dropped anyway, so ignore it.
+    try:
+        if cursor is not None:
+            cursor.close()
+    except mysql.connector.Error:
+        pass
+    try:
+        connection.close()
+    except mysql.connector.Error:
+        pass
+
+
+def put_unless_stopped(q, item, stop, poll=0.1):
+    """
+    Put item on the bounded queue q, giving up once stop is set so that a
+    producer is never left blocked after its consumer has gone. Returns
+    whether the item was queued.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=poll)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def pump(items, q, stop):
+    """
+    Producer-thread body: move items onto q until they run out or stop is
+    set. Anything raised while iterating (BaseException included) is queued
+    as a FetchError, DONE is queued last, and items is closed if it is a
+    generator so its cursor and connection are released on this thread.
+    """
+    try:
+        for item in items:
+            if not put_unless_stopped(q, item, stop):
+                return
+    except BaseException as e:
+        put_unless_stopped(q, FetchError(e), stop)
+    finally:
+        put_unless_stopped(q, DONE, stop)
+        close = getattr(items, 'close', None)
+        if close is not None:
+            close()
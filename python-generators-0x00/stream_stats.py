@@ -0,0 +1,216 @@
+import bisect
+import math
+from array import array
+import mysql.connector
+from seed import get_connection
+from parallel_scan import parallel_scan
+from stream_helpers import close_quietly
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; pure-Python paths are used without it
+    np = None
+
+SQL_AGGREGATES = {'count': 'COUNT', 'sum': 'SUM', 'avg': 'AVG', 'min': 'MIN', 'max': 'MAX'}
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+def sql_aggregate(column='age', aggregates=('count', 'sum', 'avg', 'min', 'max')):
+    """
+    Compute simple aggregates in MySQL and return them as a dict of floats,
+    so only one row crosses the wire.
+    """
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    unknown = [a for a in aggregates if a not in SQL_AGGREGATES]
+    if unknown:
+        raise ValueError(f"Aggregates that cannot be pushed down: {unknown}")
+    select = ", ".join(f"{SQL_AGGREGATES[a]}({column})" for a in aggregates)
+    connection = get_connection()
+    if not connection:
+        return None
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {select} FROM user_data")
+        row = cursor.fetchone()
+        cursor.close()
+        return {a: (float(v) if v is not None else None) for a, v in zip(aggregates, row)}
+    except mysql.connector.Error as err:
+        print(f"Error aggregating {column}: {err}")
+        return None
+    finally:
+        connection.close()
+
+
+def stream_column_chunks(column='age', chunk_size=10000):
+    """
+    Yield the values of a numeric column as array('d') chunks read with
+    fetchmany, so at most one chunk is held in memory.
+    """
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    connection = get_connection()
+    if not connection:
+        return
+    cursor = None
+    try:
+        cursor = connection.cursor(buffered=False, raw=True)
+        cursor.execute(f"SELECT {column} FROM user_data")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            # raw=True skips the per-value Decimal conversion
+            yield array('d', [float(value) for (value,) in rows])
+    except mysql.connector.Error as err:
+        print(f"Error streaming {column}: {err}")
+    finally:
+        close_quietly(cursor, connection)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch for positive values (DDSketch-style).
+    Every quantile estimate is within relative_accuracy of the true value,
+    and memory grows with the log of the value range, not the row count.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add_chunk(self, values):
+        if np is not None:
+            data = np.frombuffer(values, dtype=np.float64) if isinstance(values, array) else np.asarray(values, dtype=np.float64)
+            positive = data[data > 0]
+            self.zero_count += int(data.size - positive.size)
+            if positive.size:
+                keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma), return_counts=True)
+                for key, n in zip(keys.tolist(), counts.tolist()):
+                    self.buckets[int(key)] = self.buckets.get(int(key), 0) + n
+            self.count += int(data.size)
+            return
+        for value in values:
+            if value <= 0:
+                self.zero_count += 1
+            else:
+                key = math.ceil(math.log(value) / self.log_gamma)
+                self.buckets[key] = self.buckets.get(key, 0) + 1
+            self.count += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class StreamingStats:
+    """
+    One-pass statistics over chunks of floats: count, mean, variance, min,
+    max, a fixed-bin histogram and approximate percentiles.
+    Chunk moments are merged with Chan's parallel variance formula, so each
+    chunk is reduced in bulk (vectorised when NumPy is available).
+    """
+
+    def __init__(self, bins=None, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.bins = list(bins) if bins is not None else None
+        self.histogram = [0] * (len(self.bins) - 1) if self.bins else None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add_chunk(self, values):
+        n = len(values)
+        if not n:
+            return
+        if np is not None:
+            data = np.frombuffer(values, dtype=np.float64) if isinstance(values, array) else np.asarray(values, dtype=np.float64)
+            chunk_mean = float(data.mean())
+            chunk_m2 = float(((data - chunk_mean) ** 2).sum())
+            self.min = min(self.min, float(data.min()))
+            self.max = max(self.max, float(data.max()))
+            if self.bins:
+                counts, _ = np.histogram(data, bins=self.bins)
+                self.histogram = [a + b for a, b in zip(self.histogram, counts.tolist())]
+        else:
+            chunk_mean = math.fsum(values) / n
+            chunk_m2 = math.fsum((v - chunk_mean) ** 2 for v in values)
+            self.min = min(self.min, min(values))
+            self.max = max(self.max, max(values))
+            if self.bins:
+                self._bin_values(values)
+        delta = chunk_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.sketch.add_chunk(values)
+
+    def _bin_values(self, values):
+        lo, hi = self.bins[0], self.bins[-1]
+        last = len(self.bins) - 2
+        for value in values:
+            if value < lo or value > hi:
+                continue
+            # Match numpy.histogram: the last bin is closed on the right
+            self.histogram[min(bisect.bisect_right(self.bins, value) - 1, last)] += 1
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else None
+
+    def percentile(self, p):
+        return self.sketch.quantile(p / 100)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'stddev': math.sqrt(self.variance),
+            'min': self.min,
+            'max': self.max,
+            'histogram': list(zip(self.bins, self.histogram)) if self.bins else None,
+            'percentiles': {p: self.percentile(p) for p in percentiles},
+        }
+
+
+def parallel_column_chunks(column='age', chunk_size=10000, partitions=4):
+    """
+    Like stream_column_chunks, but reads user_id ranges concurrently
+    through parallel_scan.
+    """
+    for batch in parallel_scan(partitions, chunk_size, columns=[column]):
+        yield array('d', [float(row[column]) for row in batch])
+
+
+def column_stats(column='age', chunk_size=10000, bins=None, relative_accuracy=0.01,
+                 percentiles=(50, 90, 99), partitions=None):
+    """
+    Stream a column once and return its StreamingStats summary.
+    With partitions set, the table is scanned in parallel.
+    """
+    stats = StreamingStats(bins=bins, relative_accuracy=relative_accuracy)
+    if partitions:
+        chunks = parallel_column_chunks(column, chunk_size, partitions)
+    else:
+        chunks = stream_column_chunks(column, chunk_size)
+    for chunk in chunks:
+        stats.add_chunk(chunk)
+    return stats.summary(percentiles)